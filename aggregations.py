@@ -13,8 +13,7 @@ Tables created:
 import pandas as pd
 import numpy as np
 import logging
-from typing import Dict, Tuple
-from datetime import datetime
+from typing import Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -34,8 +33,81 @@ class GoldAggregations:
             Configuration dictionary
         """
         self.config = config
+        
+        # Set once per create_all_facts run so all four fact tables share it
+        self.calculation_timestamp: Optional[pd.Timestamp] = None
+        
         logger.info("Gold Aggregations initialized")
     
+    def get_calculation_timestamp(self) -> pd.Timestamp:
+        """
+        Get the calculation timestamp to stamp on fact tables.
+        
+        Returns
+        -------
+        pd.Timestamp
+            Timestamp cached for the current run, or the current time when a
+            fact builder is called on its own
+        """
+        if self.calculation_timestamp is not None:
+            return self.calculation_timestamp
+        return pd.Timestamp.now()
+    
+    @staticmethod
+    def calculate_utilization_pct(hours: pd.DataFrame, total_hours: pd.Series) -> np.ndarray:
+        """
+        Calculate utilization percentages for a block of state hour columns.
+        
+        The 100 / total_hours scale factor is computed once and broadcast
+        across all columns, so the whole block is scaled in a single pass.
+        
+        Parameters
+        ----------
+        hours : pd.DataFrame
+            State hour columns (e.g. running, idle, down)
+        total_hours : pd.Series
+            Total hours for each row
+        
+        Returns
+        -------
+        np.ndarray
+            Percentages with the same shape as hours (0 where total_hours <= 0)
+        """
+        total = total_hours.to_numpy(dtype=np.float64)
+        scale = np.divide(100.0, total, out=np.zeros_like(total), where=total > 0)
+        return hours.to_numpy(dtype=np.float64) * scale[:, np.newaxis]
+    
+    @staticmethod
+    def work_week_key(dates: pd.Series) -> pd.Series:
+        """
+        Build the categorical YEARWW key for a datetime64 date column.
+        
+        Dates repeat heavily (one row per entity per day), so only the
+        distinct dates are formatted and the labels are mapped back through
+        integer codes. The result is already categorical for grouping.
+        
+        Parameters
+        ----------
+        dates : pd.Series
+            Datetime64 date column
+        
+        Returns
+        -------
+        pd.Series
+            Categorical YEARWW key (ISO year + ISO week, e.g. 2025WW07)
+        """
+        date_codes, unique_dates = pd.factorize(dates)
+        week_labels = pd.DatetimeIndex(unique_dates).strftime('%GWW%V')
+        week_codes, unique_weeks = pd.factorize(week_labels)
+        
+        # Missing dates keep code -1 (NaN key)
+        codes = np.where(date_codes >= 0, week_codes[date_codes], -1)
+        return pd.Series(
+            pd.Categorical.from_codes(codes, categories=unique_weeks),
+            index=dates.index,
+            name='YEARWW'
+        )
+    
     def create_daily_production_fact(self, production_df: pd.DataFrame, state_hours_df: pd.DataFrame) -> pd.DataFrame:
         """
         Create daily production fact table.
@@ -61,32 +133,32 @@ class GoldAggregations:
                            'bagged_hours', 'total_hours', 'is_bagged']],
             left_on=['ENTITY', 'counter_date'],
             right_on=['ENTITY', 'state_date'],
-            how='left'
+            how='left',
+            suffixes=('_production', '')  # State hours columns keep their names
         )
         
-        # Select and rename columns
+        # Rename for clarity (in place on the fresh merge result - no data copy)
+        daily_fact.rename(columns={
+            'counter_date': 'production_date'
+        }, inplace=True)
+        
+        # Select columns (the projection is the only copy made)
         daily_fact = daily_fact[[
-            'ENTITY', 'FAB', 'FAB_ENTITY', 'counter_date',
+            'ENTITY', 'FAB', 'FAB_ENTITY', 'production_date',
             'wafers_produced', 'wafers_per_hour',
             'running_hours', 'idle_hours', 'down_hours', 'bagged_hours', 'total_hours',
             'is_bagged', 'part_replacement_detected',
             'counter_column_used', 'counter_keyword_used'
-        ]].copy()
-        
-        # Rename for clarity
-        daily_fact = daily_fact.rename(columns={
-            'counter_date': 'production_date'
-        })
+        ]]
         
         # Add calculation timestamp
-        daily_fact['calculation_timestamp'] = datetime.now().isoformat()
+        daily_fact['calculation_timestamp'] = self.get_calculation_timestamp()
         
         # Remove duplicates
         before_dedup = len(daily_fact)
-        daily_fact = daily_fact.drop_duplicates(
-            subset=['ENTITY', 'production_date'],
-            keep='last'
-        )
+        daily_fact = daily_fact.groupby(
+            ['ENTITY', 'production_date'], observed=True, sort=False, dropna=False
+        ).tail(1)
         after_dedup = len(daily_fact)
         
         if before_dedup > after_dedup:
@@ -112,31 +184,36 @@ class GoldAggregations:
         """
         logger.info("Creating weekly production fact table")
         
-        # Add work week column (need to parse from date)
-        daily_fact['production_date_dt'] = pd.to_datetime(daily_fact['production_date'])
-        daily_fact['year'] = daily_fact['production_date_dt'].dt.year
-        daily_fact['week'] = daily_fact['production_date_dt'].dt.isocalendar().week
-        daily_fact['YEARWW'] = daily_fact['year'].astype(str) + 'WW' + daily_fact['week'].astype(str).str.zfill(2)
+        # Work week key (production_date is already datetime64 from ingestion)
+        yearww = self.work_week_key(daily_fact['production_date'])
         
         # Aggregate by entity and week
-        weekly_fact = daily_fact.groupby(['ENTITY', 'FAB', 'FAB_ENTITY', 'YEARWW']).agg({
-            'wafers_produced': 'sum',
-            'running_hours': 'sum',
-            'idle_hours': 'sum',
-            'down_hours': 'sum',
-            'bagged_hours': 'sum',
-            'total_hours': 'sum',
-            'part_replacement_detected': 'sum',
-            'production_date': ['min', 'max', 'count']
-        }).reset_index()
-        
-        # Flatten column names
-        weekly_fact.columns = [
-            'ENTITY', 'FAB', 'FAB_ENTITY', 'YEARWW',
-            'total_wafers_produced', 'total_running_hours', 'total_idle_hours',
-            'total_down_hours', 'total_bagged_hours', 'total_hours',
-            'part_replacements_count', 'week_start_date', 'week_end_date', 'days_with_data'
-        ]
+        # Sum columns are reduced together in one block-wise pass rather than
+        # dispatching a separate aggregation per column
+        # Keys are grouped as categoricals (integer codes, only observed
+        # combinations) and left in first-seen order
+        group_keys = [daily_fact[col].astype('category') for col in ['ENTITY', 'FAB', 'FAB_ENTITY']]
+        group_keys.append(yearww)
+        grouped = daily_fact.groupby(group_keys, observed=True, sort=False)
+        sum_columns = {
+            'wafers_produced': 'total_wafers_produced',
+            'running_hours': 'total_running_hours',
+            'idle_hours': 'total_idle_hours',
+            'down_hours': 'total_down_hours',
+            'bagged_hours': 'total_bagged_hours',
+            'total_hours': 'total_hours',
+            'part_replacement_detected': 'part_replacements_count'
+        }
+        weekly_fact = grouped[list(sum_columns)].sum().rename(columns=sum_columns).reset_index()
+        weekly_dates = grouped['production_date'].agg(
+            week_start_date='min',
+            week_end_date='max',
+            days_with_data='count'
+        )
+        # Every aggregation comes from the same grouper, so groups are in the
+        # same order - attach positionally instead of joining on the MultiIndex
+        for column, values in weekly_dates.items():
+            weekly_fact[column] = values.to_numpy()
         
         # Calculate weekly wafers per hour
         weekly_fact['avg_wafers_per_hour'] = np.where(
@@ -146,14 +223,13 @@ class GoldAggregations:
         )
         
         # Add calculation timestamp
-        weekly_fact['calculation_timestamp'] = datetime.now().isoformat()
+        weekly_fact['calculation_timestamp'] = self.get_calculation_timestamp()
         
         # Remove duplicates
         before_dedup = len(weekly_fact)
-        weekly_fact = weekly_fact.drop_duplicates(
-            subset=['ENTITY', 'YEARWW'],
-            keep='last'
-        )
+        weekly_fact = weekly_fact.groupby(
+            ['ENTITY', 'YEARWW'], observed=True, sort=False, dropna=False
+        ).tail(1)
         after_dedup = len(weekly_fact)
         
         if before_dedup > after_dedup:
@@ -179,37 +255,26 @@ class GoldAggregations:
         """
         logger.info("Creating daily state hours fact table")
         
-        # Copy and add calculated metrics
-        daily_state_fact = state_hours_df.copy()
-        
         # Calculate utilization percentages
-        daily_state_fact['running_pct'] = np.where(
-            daily_state_fact['total_hours'] > 0,
-            (daily_state_fact['running_hours'] / daily_state_fact['total_hours']) * 100,
-            0
-        )
-        
-        daily_state_fact['idle_pct'] = np.where(
-            daily_state_fact['total_hours'] > 0,
-            (daily_state_fact['idle_hours'] / daily_state_fact['total_hours']) * 100,
-            0
+        utilization_pct = self.calculate_utilization_pct(
+            state_hours_df[['running_hours', 'idle_hours', 'down_hours']],
+            state_hours_df['total_hours']
         )
         
-        daily_state_fact['down_pct'] = np.where(
-            daily_state_fact['total_hours'] > 0,
-            (daily_state_fact['down_hours'] / daily_state_fact['total_hours']) * 100,
-            0
+        # Add calculated metrics and calculation timestamp in one step
+        # (assign leaves the Silver frame untouched without an explicit copy)
+        daily_state_fact = state_hours_df.assign(
+            running_pct=utilization_pct[:, 0],
+            idle_pct=utilization_pct[:, 1],
+            down_pct=utilization_pct[:, 2],
+            calculation_timestamp=self.get_calculation_timestamp()
         )
         
-        # Add calculation timestamp
-        daily_state_fact['calculation_timestamp'] = datetime.now().isoformat()
-        
         # Already deduplicated in state_hours calculation, but verify
         before_dedup = len(daily_state_fact)
-        daily_state_fact = daily_state_fact.drop_duplicates(
-            subset=['ENTITY', 'state_date'],
-            keep='last'
-        )
+        daily_state_fact = daily_state_fact.groupby(
+            ['ENTITY', 'state_date'], observed=True, sort=False, dropna=False
+        ).tail(1)
         after_dedup = len(daily_state_fact)
         
         if before_dedup > after_dedup:
@@ -235,59 +300,46 @@ class GoldAggregations:
         """
         logger.info("Creating weekly state hours fact table")
         
-        # Add work week column
-        daily_state_fact['state_date_dt'] = pd.to_datetime(daily_state_fact['state_date'])
-        daily_state_fact['year'] = daily_state_fact['state_date_dt'].dt.year
-        daily_state_fact['week'] = daily_state_fact['state_date_dt'].dt.isocalendar().week
-        daily_state_fact['YEARWW'] = daily_state_fact['year'].astype(str) + 'WW' + daily_state_fact['week'].astype(str).str.zfill(2)
-        
-        # Aggregate by entity and week
-        weekly_state_fact = daily_state_fact.groupby(['ENTITY', 'FAB', 'FAB_ENTITY', 'YEARWW']).agg({
-            'running_hours': 'sum',
-            'idle_hours': 'sum',
-            'down_hours': 'sum',
-            'bagged_hours': 'sum',
-            'total_hours': 'sum',
-            'is_bagged': 'max',  # True if bagged any day in the week
-            'state_date': ['min', 'max', 'count']
-        }).reset_index()
-        
-        # Flatten column names
-        weekly_state_fact.columns = [
-            'ENTITY', 'FAB', 'FAB_ENTITY', 'YEARWW',
-            'total_running_hours', 'total_idle_hours', 'total_down_hours',
-            'total_bagged_hours', 'total_hours', 'was_bagged_any_day',
-            'week_start_date', 'week_end_date', 'days_with_data'
-        ]
-        
-        # Calculate weekly utilization percentages
-        weekly_state_fact['running_pct'] = np.where(
-            weekly_state_fact['total_hours'] > 0,
-            (weekly_state_fact['total_running_hours'] / weekly_state_fact['total_hours']) * 100,
-            0
-        )
-        
-        weekly_state_fact['idle_pct'] = np.where(
-            weekly_state_fact['total_hours'] > 0,
-            (weekly_state_fact['total_idle_hours'] / weekly_state_fact['total_hours']) * 100,
-            0
+        # Work week key (ISO year + ISO week; state_date is already datetime64)
+        yearww = self.work_week_key(daily_state_fact['state_date'])
+        
+        # Aggregate by entity and week (hour columns summed in one block-wise pass)
+        group_keys = [daily_state_fact[col].astype('category') for col in ['ENTITY', 'FAB', 'FAB_ENTITY']]
+        group_keys.append(yearww)
+        grouped = daily_state_fact.groupby(group_keys, observed=True, sort=False)
+        sum_columns = {
+            'running_hours': 'total_running_hours',
+            'idle_hours': 'total_idle_hours',
+            'down_hours': 'total_down_hours',
+            'bagged_hours': 'total_bagged_hours',
+            'total_hours': 'total_hours'
+        }
+        weekly_state_fact = grouped[list(sum_columns)].sum().rename(columns=sum_columns).reset_index()
+        # True if bagged any day in the week
+        weekly_state_fact['was_bagged_any_day'] = grouped['is_bagged'].max().to_numpy()
+        weekly_dates = grouped['state_date'].agg(
+            week_start_date='min',
+            week_end_date='max',
+            days_with_data='count'
         )
+        # Same grouper, same group order - attached positionally (no index join)
+        for column, values in weekly_dates.items():
+            weekly_state_fact[column] = values.to_numpy()
         
-        weekly_state_fact['down_pct'] = np.where(
-            weekly_state_fact['total_hours'] > 0,
-            (weekly_state_fact['total_down_hours'] / weekly_state_fact['total_hours']) * 100,
-            0
+        # Calculate weekly utilization percentages
+        weekly_state_fact[['running_pct', 'idle_pct', 'down_pct']] = self.calculate_utilization_pct(
+            weekly_state_fact[['total_running_hours', 'total_idle_hours', 'total_down_hours']],
+            weekly_state_fact['total_hours']
         )
         
         # Add calculation timestamp
-        weekly_state_fact['calculation_timestamp'] = datetime.now().isoformat()
+        weekly_state_fact['calculation_timestamp'] = self.get_calculation_timestamp()
         
         # Remove duplicates
         before_dedup = len(weekly_state_fact)
-        weekly_state_fact = weekly_state_fact.drop_duplicates(
-            subset=['ENTITY', 'YEARWW'],
-            keep='last'
-        )
+        weekly_state_fact = weekly_state_fact.groupby(
+            ['ENTITY', 'YEARWW'], observed=True, sort=False, dropna=False
+        ).tail(1)
         after_dedup = len(weekly_state_fact)
         
         if before_dedup > after_dedup:
@@ -317,13 +369,19 @@ class GoldAggregations:
         """
         logger.info("Creating all Gold layer fact tables")
         
-        # Create daily tables
-        daily_production = self.create_daily_production_fact(production_df, state_hours_df)
-        daily_state_hours = self.create_state_hours_daily_fact(state_hours_df)
-        
-        # Create weekly tables
-        weekly_production = self.create_weekly_production_fact(daily_production)
-        weekly_state_hours = self.create_state_hours_weekly_fact(daily_state_hours)
+        # One calculation timestamp (datetime64, not a per-row string) for every table
+        self.calculation_timestamp = pd.Timestamp.now()
+        
+        try:
+            # Create daily tables
+            daily_production = self.create_daily_production_fact(production_df, state_hours_df)
+            daily_state_hours = self.create_state_hours_daily_fact(state_hours_df)
+            
+            # Create weekly tables
+            weekly_production = self.create_weekly_production_fact(daily_production)
+            weekly_state_hours = self.create_state_hours_weekly_fact(daily_state_hours)
+        finally:
+            self.calculation_timestamp = None
         
         logger.info("All Gold layer fact tables created")
         
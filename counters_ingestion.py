@@ -7,6 +7,8 @@ Features:
 - Finds latest Counters file by modified date
 - Adjusts timestamp (subtracts 1 day)
 - Loads last 4 weeks of historical data
+- Reads weekly files concurrently
+- Streams files straight to SQL Server while later files are still parsing
 - Applies entity normalization (PC -> PM)
 - Creates FAB_ENTITY key
 - Handles dynamic part counter columns
@@ -15,9 +17,13 @@ Features:
 
 import pandas as pd
 import logging
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime, timezone
-from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
 import yaml
 
 # Import helper functions
@@ -29,9 +35,11 @@ from utils.helpers import (
     create_fab_entity_key,
     load_csv_safe,
     add_metadata_columns,
-    adjust_timestamp
+    adjust_timestamp,
+    get_run_load_ts
 )
 from utils.logger import setup_logger
+from utils.database_engine import SQLServerEngine
 
 logger = logging.getLogger(__name__)
 
@@ -98,7 +106,8 @@ class CountersIngestion:
         self.logger.info(f"Discovered {len(files_to_process)} Counters files to process")
         return files_to_process
     
-    def load_single_file(self, ww_str: str, file_path: Path, modified_dt: datetime) -> pd.DataFrame:
+    def load_single_file(self, ww_str: str, file_path: Path, modified_dt: datetime,
+                         load_ts: Optional[datetime] = None) -> pd.DataFrame:
         """
         Load a single Counters file.
         
@@ -110,6 +119,9 @@ class CountersIngestion:
             Path to CSV file
         modified_dt : datetime
             File modified timestamp
+        load_ts : datetime, optional
+            Load timestamp (defaults to the run load timestamp if one is set,
+            otherwise current UTC time)
         
         Returns
         -------
@@ -120,7 +132,11 @@ class CountersIngestion:
         self.logger.info(f"File modified: {modified_dt}")
         
         # Load CSV
-        df = load_csv_safe(file_path, expected_columns=None)  # No expected columns (dynamic)
+        df = load_csv_safe(
+            file_path,
+            expected_columns=None,  # No expected columns (dynamic)
+            dtype_backend=self.source_config.get('dtype_backend')
+        )
         
         # Validate ENTITY column exists
         if 'ENTITY' not in df.columns:
@@ -139,7 +155,9 @@ class CountersIngestion:
             # This may need refinement based on actual data structure
             self.logger.warning("FAB column not found in Counters file - will need to derive from ENTITY or other source")
             # Placeholder: extract first part of ENTITY before underscore
-            df['FAB'] = df['ENTITY'].str.split('_').str[0]
+            # (one regex replace drops everything from the first '_' - no split
+            # lists, and a single kernel on Arrow-backed strings)
+            df['FAB'] = df['ENTITY'].str.replace(r'_.*', '', regex=True)
         
         # Create FAB_ENTITY key
         df = create_fab_entity_key(df, fab_column='FAB', entity_column='ENTITY')
@@ -148,22 +166,94 @@ class CountersIngestion:
         date_adjustment = self.counters_config.get('date_adjustment_days', -1)
         adjusted_ts = adjust_timestamp(modified_dt, days=date_adjustment)
         
-        # Add metadata columns
+        # Add metadata columns, including counter_date (adjusted timestamp date,
+        # stored as datetime64 so downstream layers never need to re-parse it)
         df = add_metadata_columns(
             df,
             source_file=file_path.name,
             load_ww=ww_str,
-            load_ts=datetime.now(timezone.utc)
+            load_ts=load_ts,
+            extra_columns={
+                'counter_date': pd.Timestamp(adjusted_ts.date()),
+                'file_modified_ts': modified_dt.isoformat()
+            }
         )
         
-        # Add counter_date column (adjusted timestamp date)
-        df['counter_date'] = adjusted_ts.date()
-        df['file_modified_ts'] = modified_dt.isoformat()
-        
         self.logger.info(f"Counter date (adjusted): {adjusted_ts.date()}")
         
         return df
     
+    def iter_single_files(self, mode: str = 'full') -> Iterator[pd.DataFrame]:
+        """
+        Load Counters files one at a time, in discovery order.
+        
+        Files are read concurrently, but only a small window of files is in
+        flight at once, so memory stays bounded by a few files rather than
+        the whole history. Each yielded frame is deduplicated on FAB_ENTITY
+        (counter_date is constant within a file). Every file read in one call
+        carries the same load_ts.
+        
+        Parameters
+        ----------
+        mode : str
+            'full' or 'incremental'
+        
+        Yields
+        ------
+        pd.DataFrame
+            Processed DataFrame for one Counters file
+        """
+        # Discover files
+        files_to_process = self.discover_files(mode)
+        
+        if not files_to_process:
+            self.logger.warning("No Counters files found to process")
+            return
+        
+        # One load timestamp for every file of this load, so server-side
+        # deduplication ranks rows by file_modified_ts rather than by which
+        # file happened to finish parsing first (also when no pipeline run
+        # timestamp has been set, e.g. standalone streaming)
+        load_ts = get_run_load_ts()
+        
+        max_workers = min(4, len(files_to_process))
+        pending_files = iter(files_to_process)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = deque()
+            
+            def submit_next() -> None:
+                next_file = next(pending_files, None)
+                if next_file is not None:
+                    ww_str, file_path, modified_dt = next_file
+                    in_flight.append(
+                        (file_path, executor.submit(self.load_single_file, ww_str, file_path, modified_dt, load_ts))
+                    )
+            
+            for _ in range(max_workers):
+                submit_next()
+            
+            # Results are consumed in discovery order so "last occurrence"
+            # keeps the same meaning as a sequential read
+            while in_flight:
+                file_path, future = in_flight.popleft()
+                submit_next()
+                
+                try:
+                    df = future.result()
+                except Exception as e:
+                    self.logger.error(f"Error loading {file_path}: {e}")
+                    continue
+                
+                # Deduplicate on: FAB_ENTITY (+ constant counter_date)
+                # Keep the most recent row (last occurrence)
+                before_dedup = len(df)
+                df = df.groupby('FAB_ENTITY', sort=False, dropna=False).tail(1)
+                if before_dedup > len(df):
+                    self.logger.info(f"Removed {before_dedup - len(df)} duplicate rows from {file_path.name}")
+                
+                yield df
+    
     def load_all_files(self, mode: str = 'full') -> pd.DataFrame:
         """
         Load all Counters files.
@@ -180,22 +270,7 @@ class CountersIngestion:
         """
         self.logger.info(f"Starting Counters ingestion (mode: {mode})")
         
-        # Discover files
-        files_to_process = self.discover_files(mode)
-        
-        if not files_to_process:
-            self.logger.warning("No Counters files found to process")
-            return pd.DataFrame()
-        
-        # Load all files
-        all_dfs = []
-        for ww_str, file_path, modified_dt in files_to_process:
-            try:
-                df = self.load_single_file(ww_str, file_path, modified_dt)
-                all_dfs.append(df)
-            except Exception as e:
-                self.logger.error(f"Error loading {file_path}: {e}")
-                continue
+        all_dfs = list(self.iter_single_files(mode))
         
         if not all_dfs:
             self.logger.error("No Counters files loaded successfully")
@@ -203,20 +278,21 @@ class CountersIngestion:
         
         # Combine all DataFrames
         # Note: Different files may have different part counter columns
-        combined_df = pd.concat(all_dfs, ignore_index=True, sort=False)
-        
-        # Remove duplicates before loading to database
-        # Deduplicate on: FAB_ENTITY + counter_date
-        # Keep the most recent load (last occurrence)
-        before_dedup = len(combined_df)
-        combined_df = combined_df.drop_duplicates(
-            subset=['FAB_ENTITY', 'counter_date'],
-            keep='last'
-        )
-        after_dedup = len(combined_df)
-        
-        if before_dedup > after_dedup:
-            self.logger.info(f"Removed {before_dedup - after_dedup} duplicate rows before database load")
+        # (a single file - the usual incremental run - is used as is, no copy)
+        if len(all_dfs) == 1:
+            combined_df = all_dfs[0].reset_index(drop=True)
+        else:
+            combined_df = pd.concat(all_dfs, ignore_index=True, sort=False, copy=False)
+        
+        # Rows from different files can only collide when two files resolve to
+        # the same counter_date - only then is the combined frame deduplicated
+        counter_dates = [df['counter_date'].iat[0] for df in all_dfs if not df.empty]
+        if len(set(counter_dates)) < len(counter_dates):
+            before_dedup = len(combined_df)
+            combined_df = combined_df.groupby(
+                ['FAB_ENTITY', 'counter_date'], sort=False, dropna=False
+            ).tail(1)
+            self.logger.info(f"Removed {before_dedup - len(combined_df)} duplicate rows across files")
         
         # Log column count
         total_columns = len(combined_df.columns)
@@ -230,6 +306,87 @@ class CountersIngestion:
         
         return combined_df
     
+    def stream_to_sqlserver(self, mode: str = 'full',
+                            table_params_key: str = 'COUNTERS_SQLSERVER_OUTPUT') -> int:
+        """
+        Load Counters files and insert them into SQL Server as they are parsed.
+        
+        A consumer thread inserts each file while the next ones are being read
+        (at most two parsed files wait in the queue). Cross-file duplicates are
+        removed server-side afterwards, keeping the most recent load of each
+        FAB_ENTITY + counter_date for the dates just loaded.
+        
+        Parameters
+        ----------
+        mode : str
+            'full' or 'incremental'
+        table_params_key : str
+            Key for table parameters in config
+        
+        Returns
+        -------
+        int
+            Number of rows inserted
+        """
+        self.logger.info(f"Starting streaming Counters ingestion (mode: {mode})")
+        
+        engine = SQLServerEngine(self.config, table_params_key)
+        frames: queue.Queue = queue.Queue(maxsize=2)
+        rows_inserted = 0
+        load_errors = []
+        
+        def insert_frames() -> None:
+            nonlocal rows_inserted
+            while True:
+                df = frames.get()
+                if df is None:
+                    break
+                if load_errors:
+                    continue  # Drain the queue after a failure
+                try:
+                    rows_inserted += engine.load_dataframe(df, if_exists='append')
+                except Exception as e:
+                    load_errors.append(e)
+        
+        consumer = threading.Thread(target=insert_frames, name='counters-sqlserver-loader')
+        consumer.start()
+        
+        counter_dates = []
+        try:
+            for df in self.iter_single_files(mode):
+                if load_errors:
+                    break
+                if df.empty:
+                    continue
+                counter_dates.append(df['counter_date'].iat[0])
+                frames.put(df)
+        finally:
+            frames.put(None)
+            consumer.join()
+        
+        if load_errors:
+            self.logger.error(f"Streaming Counters load failed after {rows_inserted} rows")
+            raise load_errors[0]
+        
+        if not counter_dates:
+            self.logger.error("No Counters files loaded successfully")
+            return 0
+        
+        duplicates_removed = engine.delete_duplicates(
+            key_columns=['FAB_ENTITY', 'counter_date'],
+            order_columns=['load_ts', 'file_modified_ts'],
+            filter_column='counter_date',
+            filter_values=sorted(set(counter_dates))
+        )
+        if duplicates_removed:
+            self.logger.info(f"Removed {duplicates_removed} duplicate rows from {engine.table_name}")
+        
+        self.logger.info(
+            f"Streaming Counters ingestion complete: {rows_inserted} rows from {len(counter_dates)} files"
+        )
+        
+        return rows_inserted - duplicates_removed
+    
     def run(self, mode: str = 'full') -> pd.DataFrame:
         """
         Main entry point for Counters ingestion.
@@ -267,6 +424,29 @@ def run_counters_ingestion(config: Dict, mode: str = 'full') -> pd.DataFrame:
     return ingestion.run(mode)
 
 
+def stream_counters_to_sqlserver(config: Dict, mode: str = 'full',
+                                 table_params_key: str = 'COUNTERS_SQLSERVER_OUTPUT') -> int:
+    """
+    Standalone function to stream Counters files into SQL Server.
+    
+    Parameters
+    ----------
+    config : dict
+        Configuration dictionary
+    mode : str
+        'full' or 'incremental'
+    table_params_key : str
+        Key for table parameters in config
+    
+    Returns
+    -------
+    int
+        Number of rows loaded
+    """
+    ingestion = CountersIngestion(config)
+    return ingestion.stream_to_sqlserver(mode, table_params_key)
+
+
 if __name__ == "__main__":
     # Test script
     import sys
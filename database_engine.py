@@ -7,14 +7,19 @@ Features:
 - SQL Server connection management
 - DataFrame to SQL insertion with error handling
 - Batch loading for large datasets
+- BULK INSERT via a shared file for very large loads
 - Transaction support
+- Server-side duplicate removal
 """
 
 import pyodbc
 import pandas as pd
+import csv
 import logging
-from typing import Dict, Optional
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 import os
+import uuid
 from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
@@ -53,6 +58,15 @@ class SQLServerEngine:
         self.table_name = self.sqlserver_config['table_name']
         self.driver = self.sqlserver_config.get('driver', 'ODBC Driver 18 for SQL Server')
         self.trusted_connection = self.sqlserver_config.get('trusted_connection', False)
+        self.batch_size = self.sqlserver_config.get('batch_size', 10000)
+        
+        # BULK INSERT settings (bulk path only used when a shared folder is configured)
+        self.bulk_load_path = self.sqlserver_config.get('bulk_load_path')
+        self.bulk_load_threshold = self.sqlserver_config.get('bulk_load_threshold', 10000)
+        
+        # Whether the server's BULK INSERT supports FORMAT = 'CSV' (SQL Server
+        # 2017+), checked on first use
+        self.bulk_csv_format: Optional[bool] = None
         
         logger.info(f"SQL Server Engine initialized for {self.database}.{self.schema}.{self.table_name}")
     
@@ -103,6 +117,23 @@ class SQLServerEngine:
             logger.error(f"Failed to connect to SQL Server: {e}")
             raise
     
+    @staticmethod
+    def _column_to_list(series: pd.Series) -> list:
+        """
+        Convert a column to native Python values for parameter binding.
+        
+        Parameters
+        ----------
+        series : pd.Series
+            DataFrame column
+        
+        Returns
+        -------
+        list
+            Column values with missing values (NaN/NaT/None) as None
+        """
+        return series.astype(object).where(series.notna(), None).tolist()
+    
     def load_dataframe(self, df: pd.DataFrame, if_exists: str = 'append') -> int:
         """
         Load DataFrame to SQL Server table.
@@ -123,12 +154,19 @@ class SQLServerEngine:
             logger.warning("DataFrame is empty, nothing to load")
             return 0
         
+        # Large frames go through BULK INSERT when the server can read our files
+        # (and parse every value written to them)
+        if self.bulk_load_path and len(df) > self.bulk_load_threshold and self.can_bulk_load(df):
+            return self.bulk_load_dataframe(df)
+        
         logger.info(f"Loading {len(df)} rows to {self.table_name}")
         
         conn = self.get_connection()
-        cursor = conn.cursor()
+        rows_inserted = 0
         
         try:
+            cursor = conn.cursor()
+            
             # Get column names
             columns = df.columns.tolist()
             
@@ -141,14 +179,31 @@ class SQLServerEngine:
                 VALUES ({placeholders})
             """
             
-            # Convert DataFrame to list of tuples
-            data_tuples = [tuple(row) for row in df.values]
+            # Per-column value lists - rows are zipped from these one batch at a
+            # time so each column keeps its own type (no df.values upcast)
+            column_values = [self._column_to_list(df[col]) for col in columns]
             
-            # Execute batch insert
-            cursor.executemany(insert_sql, data_tuples)
-            conn.commit()
+            # Parameters bound as arrays, not row by row
+            cursor.fast_executemany = True
+            
+            # Insert and commit in fixed-size batches to bound driver memory
+            # and transaction log growth
+            for start in range(0, len(df), self.batch_size):
+                data_tuples = list(zip(*(values[start:start + self.batch_size] for values in column_values)))
+                
+                try:
+                    cursor.executemany(insert_sql, data_tuples)
+                    conn.commit()
+                except Exception:
+                    logger.error(
+                        f"Batch starting at row {start} failed "
+                        f"({rows_inserted} rows already committed); first row in batch: {data_tuples[0]}"
+                    )
+                    raise
+                
+                rows_inserted += len(data_tuples)
+                logger.debug("Committed %d/%d rows to %s", rows_inserted, len(df), self.table_name)
             
-            rows_inserted = len(data_tuples)
             logger.info(f"Successfully loaded {rows_inserted} rows to {self.table_name}")
             
             return rows_inserted
@@ -158,6 +213,282 @@ class SQLServerEngine:
             logger.error(f"Error loading data to {self.table_name}: {e}")
             raise
         
+        finally:
+            # Closing the connection also closes any open cursor
+            conn.close()
+    
+    def supports_csv_bulk_format(self) -> bool:
+        """
+        Check whether the server's BULK INSERT supports FORMAT = 'CSV'.
+        
+        FORMAT = 'CSV' (SQL Server 2017, major version 14, and later) is what
+        makes BULK INSERT honour quoted fields. The result is cached on the
+        engine.
+        
+        Returns
+        -------
+        bool
+            True if quoted CSV fields can be bulk loaded
+        """
+        if self.bulk_csv_format is None:
+            conn = self.get_connection()
+            try:
+                cursor = conn.cursor()
+                major_version = cursor.execute(
+                    "SELECT CAST(SERVERPROPERTY('ProductMajorVersion') AS INT)"
+                ).fetchone()[0]
+                self.bulk_csv_format = (major_version or 0) >= 14
+            finally:
+                conn.close()
+            
+            logger.info(f"BULK INSERT FORMAT = 'CSV' supported: {self.bulk_csv_format}")
+        
+        return self.bulk_csv_format
+    
+    @staticmethod
+    def has_bulk_terminators(df: pd.DataFrame) -> bool:
+        """
+        Check text columns for the bulk file's field and row terminators.
+        
+        Parameters
+        ----------
+        df : pd.DataFrame
+            DataFrame to load
+        
+        Returns
+        -------
+        bool
+            True if any text value contains the field separator or a line break
+        """
+        terminators = '[\x01\r\n]'
+        for col in df.select_dtypes(include=['object', 'string', 'category']).columns:
+            values = df[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Only the distinct values need checking
+                values = values.cat.categories.to_series()
+            if values.astype('string').str.contains(terminators, regex=True, na=False).any():
+                return True
+        return False
+    
+    def can_bulk_load(self, df: pd.DataFrame) -> bool:
+        """
+        Check whether a DataFrame can be loaded with BULK INSERT.
+        
+        With FORMAT = 'CSV' every value is written quoted as needed. Older
+        servers read fields verbatim, so a value containing the field or row
+        terminator would split its row; such frames use the batched INSERT
+        path instead.
+        
+        Parameters
+        ----------
+        df : pd.DataFrame
+            DataFrame to load
+        
+        Returns
+        -------
+        bool
+            True if bulk_load_dataframe can load the DataFrame
+        """
+        if self.supports_csv_bulk_format():
+            return True
+        
+        if self.has_bulk_terminators(df):
+            logger.warning(
+                f"Text values in the load to {self.table_name} contain field/row terminators "
+                f"and the server does not support FORMAT = 'CSV' - using batched INSERT"
+            )
+            return False
+        
+        return True
+    
+    def bulk_load_dataframe(self, df: pd.DataFrame) -> int:
+        """
+        Load DataFrame to SQL Server table with BULK INSERT.
+        
+        The DataFrame is written to a delimited file in bulk_load_path (a share
+        readable by SQL Server), bulk loaded into a temp staging table with the
+        DataFrame's columns, then copied into the target table in a single
+        INSERT ... SELECT. Staging keeps the file-to-column mapping by name, so
+        identity and unlisted columns in the target table are unaffected.
+        
+        On servers with FORMAT = 'CSV' the file uses CSV quoting, so values
+        containing quotes, the separator or newlines load unchanged. Older
+        servers get an unquoted file, and DataFrames with terminators in their
+        text values are rejected (load_dataframe routes those to the batched
+        INSERT path).
+        
+        Parameters
+        ----------
+        df : pd.DataFrame
+            DataFrame to load
+        
+        Returns
+        -------
+        int
+            Number of rows inserted
+        """
+        if df.empty:
+            logger.warning("DataFrame is empty, nothing to load")
+            return 0
+        
+        if not self.can_bulk_load(df):
+            raise ValueError(
+                f"Cannot bulk load {self.table_name}: text values contain field/row terminators "
+                f"and the server does not support FORMAT = 'CSV'"
+            )
+        
+        logger.info(f"Bulk loading {len(df)} rows to {self.table_name}")
+        
+        columns_str = ','.join([f"[{col}]" for col in df.columns])
+        file_path = Path(self.bulk_load_path) / f"{self.table_name}_{uuid.uuid4().hex}.dat"
+        
+        # \x01 field separator avoids clashing with commas in source values;
+        # missing values are written as empty fields and loaded as NULL. With
+        # FORMAT = 'CSV' values containing quotes, the separator or newlines
+        # are quoted; otherwise nothing is quoted (BULK INSERT would load the
+        # quotes literally) and can_bulk_load has ruled out terminators
+        csv_format = self.supports_csv_bulk_format()
+        
+        # Boolean columns (including object columns of True/False) go to BIT
+        # columns as 0/1 rather than True/False text; missing stays NULL
+        bool_columns = {
+            col: 'Int8' for col in df.columns
+            if pd.api.types.is_bool_dtype(df[col].dtype)
+            or (df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True) == 'boolean')
+        }
+        if bool_columns:
+            df = df.astype(bool_columns)
+        
+        # Datetimes keep their fractional seconds (DATETIME2(7) columns), so
+        # bulk loaded values match the batched INSERT path
+        df.to_csv(
+            file_path,
+            index=False,
+            header=False,
+            sep='\x01',
+            lineterminator='\n',
+            quoting=csv.QUOTE_MINIMAL if csv_format else csv.QUOTE_NONE,
+            encoding='utf-8',
+            date_format='%Y-%m-%d %H:%M:%S.%f'
+        )
+        format_options = "FORMAT = 'CSV', FIELDQUOTE = '\"', " if csv_format else ""
+        
+        conn = self.get_connection()
+        
+        try:
+            cursor = conn.cursor()
+            
+            cursor.execute(
+                f"SELECT TOP 0 {columns_str} INTO #bulk_stage FROM {self.schema}.{self.table_name}"
+            )
+            cursor.execute(f"""
+                BULK INSERT #bulk_stage FROM '{file_path}'
+                WITH ({format_options}FIELDTERMINATOR = '0x01', ROWTERMINATOR = '0x0a', CODEPAGE = '65001',
+                      KEEPNULLS, TABLOCK, BATCHSIZE = 100000)
+            """)
+            cursor.execute(f"""
+                INSERT INTO {self.schema}.{self.table_name} ({columns_str})
+                SELECT {columns_str} FROM #bulk_stage
+            """)
+            rows_inserted = cursor.rowcount
+            conn.commit()
+            
+            logger.info(f"Successfully bulk loaded {rows_inserted} rows to {self.table_name}")
+            
+            return rows_inserted
+        
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Error bulk loading data to {self.table_name}: {e}")
+            raise
+        
+        finally:
+            conn.close()
+            file_path.unlink(missing_ok=True)
+    
+    def duplicate_ranking_sql(self, key_columns: List[str], order_columns: List[str],
+                              filter_column: Optional[str] = None, filter_values: Optional[List] = None,
+                              ascending_order_columns: Optional[List[str]] = None) -> Tuple[str, List]:
+        """
+        Build the query ranking rows within each key for delete_duplicates.
+        
+        The row ranked 1 (row_num) is the one kept. Parameters are as for
+        delete_duplicates.
+        
+        Returns
+        -------
+        tuple of (str, list)
+            SELECT statement (all columns plus row_num) and its parameters
+        """
+        partition_str = ','.join([f"[{col}]" for col in key_columns])
+        order_str = ','.join(
+            [f"[{col}] DESC" for col in order_columns] +
+            [f"[{col}] ASC" for col in (ascending_order_columns or [])]
+        )
+        
+        where_sql = ''
+        params = []
+        if filter_column and filter_values:
+            placeholders = ','.join(['?' for _ in filter_values])
+            where_sql = f"WHERE [{filter_column}] IN ({placeholders})"
+            params = [value.to_pydatetime() if isinstance(value, pd.Timestamp) else value
+                      for value in filter_values]
+        
+        ranking_sql = f"""
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY {partition_str} ORDER BY {order_str}) AS row_num
+                FROM {self.schema}.{self.table_name}
+                {where_sql}
+            """
+        
+        return ranking_sql, params
+    
+    def delete_duplicates(self, key_columns: List[str], order_columns: List[str],
+                          filter_column: Optional[str] = None, filter_values: Optional[List] = None,
+                          ascending_order_columns: Optional[List[str]] = None) -> int:
+        """
+        Delete duplicate rows server-side, keeping the latest row per key.
+        
+        Parameters
+        ----------
+        key_columns : list of str
+            Columns that identify a unique row
+        order_columns : list of str
+            Columns ordering duplicates; the row with the highest values is kept
+        filter_column : str, optional
+            Restrict the check to rows where this column is in filter_values
+        filter_values : list, optional
+            Values of filter_column to check
+        ascending_order_columns : list of str, optional
+            Columns breaking remaining ties; the row with the lowest values is kept
+        
+        Returns
+        -------
+        int
+            Number of rows deleted
+        """
+        ranking_sql, params = self.duplicate_ranking_sql(
+            key_columns, order_columns, filter_column, filter_values, ascending_order_columns
+        )
+        
+        delete_sql = f"""
+            WITH ranked AS ({ranking_sql})
+            DELETE FROM ranked WHERE row_num > 1
+        """
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(delete_sql, *params)
+            rows_deleted = cursor.rowcount
+            conn.commit()
+            return rows_deleted
+        
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Error deleting duplicates from {self.table_name}: {e}")
+            raise
+        
         finally:
             cursor.close()
             conn.close()
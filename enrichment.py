@@ -6,16 +6,18 @@ Orchestrates all Silver layer calculations:
 - Wafer production calculation
 - Part replacement tracking
 
-Combines Bronze data into enriched Silver tables.
+Combines Bronze data into enriched Silver tables. State hours and wafer
+production can optionally run in parallel worker processes on entity shards.
 """
 
 import pandas as pd
+import numpy as np
 import logging
-from typing import Dict, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Tuple
 
-from etl.silver.state_hours import calculate_state_hours
-from etl.silver.wafer_production import calculate_wafer_production
-from etl.silver.part_replacements import track_part_replacements
+# The calculation modules are imported where each step runs, so importing
+# this orchestrator does not load them
 
 logger = logging.getLogger(__name__)
 
@@ -55,24 +57,188 @@ class SilverEnrichment:
         """
         logger.info("Starting Silver layer enrichment")
         
-        # Step 1: Calculate state hours
-        logger.info("STEP 1: Calculating state hours")
-        state_hours_df = calculate_state_hours(self.config, entity_states_df)
-        logger.info(f"State hours complete: {len(state_hours_df)} rows")
+        max_workers = self.config.get('silver_enrichment', {}).get('max_workers', 1)
         
-        # Step 2: Calculate wafer production (requires state hours)
-        logger.info("STEP 2: Calculating wafer production")
-        production_df = calculate_wafer_production(self.config, counters_df, state_hours_df)
-        logger.info(f"Wafer production complete: {len(production_df)} rows")
+        if max_workers > 1:
+            # Steps 1 and 2 per entity shard in worker processes
+            logger.info(f"STEPS 1-2: Calculating state hours and wafer production ({max_workers} workers)")
+            state_hours_df, production_df = self.enrich_parallel(entity_states_df, counters_df, max_workers)
+            logger.info(f"State hours complete: {len(state_hours_df)} rows")
+            logger.info(f"Wafer production complete: {len(production_df)} rows")
+        else:
+            # Step 1: Calculate state hours
+            logger.info("STEP 1: Calculating state hours")
+            from etl.silver.state_hours import calculate_state_hours
+            state_hours_df = calculate_state_hours(self.config, entity_states_df)
+            logger.info(f"State hours complete: {len(state_hours_df)} rows")
+            
+            # Step 2: Calculate wafer production (requires state hours)
+            logger.info("STEP 2: Calculating wafer production")
+            from etl.silver.wafer_production import calculate_wafer_production
+            production_df = calculate_wafer_production(self.config, counters_df, state_hours_df)
+            logger.info(f"Wafer production complete: {len(production_df)} rows")
         
         # Step 3: Track part replacements
         logger.info("STEP 3: Tracking part replacements")
+        from etl.silver.part_replacements import track_part_replacements
         replacements_df = track_part_replacements(self.config, production_df)
         logger.info(f"Part replacements complete: {len(replacements_df)} rows")
         
         logger.info("Silver layer enrichment complete")
         
         return state_hours_df, production_df, replacements_df
+    
+    def split_by_entity(self, entity_states_df: pd.DataFrame, counters_df: pd.DataFrame,
+                        num_shards: int) -> List[Tuple[pd.DataFrame, pd.DataFrame]]:
+        """
+        Split EntityStates and Counters data into shards of whole entities.
+        
+        Every calculation in steps 1-2 is per ENTITY, so an entity's rows from
+        both sources always land in the same shard. Rows without an ENTITY
+        are dropped (the calculations group by ENTITY and ignore them anyway).
+        
+        Parameters
+        ----------
+        entity_states_df : pd.DataFrame
+            EntityStates Bronze data
+        counters_df : pd.DataFrame
+            Counters Bronze data
+        num_shards : int
+            Number of shards
+        
+        Returns
+        -------
+        List[Tuple[pd.DataFrame, pd.DataFrame]]
+            (entity_states_shard, counters_shard) pairs
+        """
+        # Distinct entities from both sources, in order of appearance (either
+        # source may be empty)
+        entities = pd.Index(np.concatenate([
+            np.asarray(df['ENTITY'].dropna().unique(), dtype=object) for df in (entity_states_df, counters_df)
+        ])).unique()
+        entity_shard = pd.Series(np.arange(len(entities)) % num_shards, index=entities)
+        
+        states_shard_ids = entity_states_df['ENTITY'].map(entity_shard)
+        counters_shard_ids = counters_df['ENTITY'].map(entity_shard)
+        
+        return [
+            (entity_states_df[states_shard_ids == shard], counters_df[counters_shard_ids == shard])
+            for shard in range(num_shards)
+        ]
+    
+    def enrich_parallel(self, entity_states_df: pd.DataFrame, counters_df: pd.DataFrame,
+                        max_workers: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Calculate state hours and wafer production on entity shards in parallel.
+        
+        Each shard's wafer production is submitted as soon as its state hours
+        are ready, so the two steps overlap across shards. Results are
+        identical to the serial path, in the same row order and with the same
+        dtypes (see combine_parts).
+        
+        Parameters
+        ----------
+        entity_states_df : pd.DataFrame
+            EntityStates Bronze data
+        counters_df : pd.DataFrame
+            Counters Bronze data
+        max_workers : int
+            Number of worker processes (and shards)
+        
+        Returns
+        -------
+        Tuple[pd.DataFrame, pd.DataFrame]
+            (state_hours, wafer_production)
+        """
+        from etl.silver.state_hours import calculate_state_hours
+        from etl.silver.wafer_production import calculate_wafer_production
+        
+        shards = self.split_by_entity(entity_states_df, counters_df, max_workers)
+        
+        state_hours_parts = []
+        production_futures = []
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            state_futures = {}
+            for shard, (states_shard, counters_shard) in enumerate(shards):
+                if not states_shard.empty:
+                    state_futures[executor.submit(calculate_state_hours, self.config, states_shard)] = shard
+                elif not counters_shard.empty:
+                    # No EntityStates rows for these entities - no running hours
+                    no_state_hours = pd.DataFrame(columns=['ENTITY', 'state_date', 'running_hours'])
+                    production_futures.append(
+                        executor.submit(calculate_wafer_production, self.config, counters_shard, no_state_hours)
+                    )
+            
+            for future in as_completed(state_futures):
+                shard_state_hours = future.result()
+                state_hours_parts.append(shard_state_hours)
+                
+                counters_shard = shards[state_futures[future]][1]
+                if not counters_shard.empty:
+                    production_futures.append(
+                        executor.submit(calculate_wafer_production, self.config, counters_shard, shard_state_hours)
+                    )
+            
+            production_parts = [future.result() for future in production_futures]
+        
+        # Restore the serial path's row order (sorted group keys). With no
+        # rows for a step there are no parts, so the serial path is run on the
+        # (empty) input for its empty result
+        if state_hours_parts:
+            state_hours_df = self.combine_parts(state_hours_parts, ['ENTITY', 'FAB', 'FAB_ENTITY', 'state_date'])
+        else:
+            state_hours_df = calculate_state_hours(self.config, entity_states_df)
+        
+        if production_parts:
+            production_df = self.combine_parts(production_parts, ['ENTITY', 'counter_date'])
+        else:
+            production_df = calculate_wafer_production(self.config, counters_df, state_hours_df)
+        
+        return state_hours_df, production_df
+    
+    def combine_parts(self, parts: List[pd.DataFrame], sort_columns: List[str]) -> pd.DataFrame:
+        """
+        Concatenate per-shard results in the serial path's row order.
+        
+        Categorical columns whose categories differ between shards (e.g. the
+        ENTITY and calculation_notes of wafer production, built from each
+        shard's own rows) would come out of concat as object columns. They
+        are rebuilt with the categories the serial path gives them: the
+        categories every shard shares (fixed categories, in their original
+        order), then the remaining values in order of first appearance.
+        
+        Parameters
+        ----------
+        parts : List[pd.DataFrame]
+            Shard results (at least one)
+        sort_columns : List[str]
+            Columns giving the serial path's row order
+        
+        Returns
+        -------
+        pd.DataFrame
+            Combined results
+        """
+        combined = (
+            pd.concat(parts, ignore_index=True)
+            .sort_values(sort_columns, kind='stable')
+            .reset_index(drop=True)
+        )
+        
+        for col in combined.columns:
+            dtypes = [part[col].dtype for part in parts]
+            if isinstance(combined[col].dtype, pd.CategoricalDtype) or not all(
+                isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes
+            ):
+                continue
+            
+            shared = set.intersection(*[set(dtype.categories) for dtype in dtypes])
+            categories = [category for category in dtypes[0].categories if category in shared]
+            categories += [value for value in combined[col].dropna().unique() if value not in shared]
+            combined[col] = pd.Categorical(combined[col], categories=pd.Index(categories, dtype=object))
+        
+        return combined
 
 
 def run_silver_enrichment(config: Dict, 
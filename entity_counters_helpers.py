@@ -3,18 +3,20 @@ Helper Functions for Entity States & Counters Pipeline
 ======================================================
 Contains reusable functions for:
 - Work week calculation (Intel fiscal calendar)
-- File discovery (EntityStates and latest Counters)
+- File discovery (EntityStates and latest Counters), cached per run
 - Entity name normalization (PC -> PM conversion)
 - FAB_ENTITY key creation
 - DataFrame utilities
 """
 
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
+from functools import lru_cache
 from pathlib import Path
 import logging
 import pandas as pd
 import numpy as np
 from typing import Tuple, Dict, List, Optional
+import fnmatch
 import os
 
 logger = logging.getLogger(__name__)
@@ -24,6 +26,83 @@ logger = logging.getLogger(__name__)
 # Work Week Calculation
 # ============================================================================
 
+@lru_cache(maxsize=64)
+def _fiscal_year_start(fiscal_year: int) -> date:
+    """
+    Get the start date of an Intel fiscal year.
+    
+    Parameters
+    ----------
+    fiscal_year : int
+        Fiscal year
+    
+    Returns
+    -------
+    date
+        Sunday closest to December 28 of the previous calendar year
+    """
+    dec_28 = date(fiscal_year - 1, 12, 28)
+    days_since_sunday = (dec_28.weekday() + 1) % 7
+    return dec_28 - timedelta(days=days_since_sunday)
+
+
+def get_intel_ww_vec(dates: np.ndarray) -> np.ndarray:
+    """
+    Calculate Intel work week strings for an array of dates.
+    
+    Same fiscal calendar as get_intel_ww, computed with integer day
+    arithmetic on the whole array; fiscal year starts are only looked up for
+    the few distinct years involved.
+    
+    Parameters
+    ----------
+    dates : np.ndarray
+        Dates (datetime64, any unit; truncated to days)
+    
+    Returns
+    -------
+    np.ndarray
+        Work week strings in format 'YYYYWWNN', one per date ('' for NaT)
+    """
+    all_days = np.asarray(dates, dtype='datetime64[D]')
+    
+    # NaT has no work week; only valid dates go through the calculation
+    is_valid = ~np.isnat(all_days)
+    days = all_days[is_valid]
+    if days.size == 0:
+        return np.full(all_days.shape, '', dtype=str)
+    
+    day_numbers = days.astype(np.int64)
+    
+    # ISO year = calendar year of the week's Thursday (1970-01-01 was a Thursday)
+    iso_weekday = (day_numbers + 3) % 7  # Monday = 0
+    thursdays = (day_numbers - iso_weekday + 3).astype('datetime64[D]')
+    iso_years = thursdays.astype('datetime64[Y]').astype(np.int64) + 1970
+    
+    # Fiscal year starts for every year that can be needed (ISO year and the one before)
+    first_year = int(iso_years.min()) - 1
+    year_starts = np.array(
+        [_fiscal_year_start(year) for year in range(first_year, int(iso_years.max()) + 1)],
+        dtype='datetime64[D]'
+    )
+    
+    # Dates before their ISO year's fiscal start belong to the previous fiscal year
+    fiscal_years = iso_years - (days < year_starts[iso_years - first_year])
+    fiscal_starts = year_starts[fiscal_years - first_year]
+    fiscal_weeks = (days - fiscal_starts) // np.timedelta64(7, 'D') + 1
+    
+    work_weeks = np.char.add(
+        np.char.add(fiscal_years.astype(str), 'WW'),
+        np.char.zfill(fiscal_weeks.astype(str), 2)
+    )
+    if is_valid.all():
+        return work_weeks.reshape(all_days.shape)
+    
+    result = np.full(all_days.shape, '', dtype=work_weeks.dtype)
+    result[is_valid] = work_weeks
+    return result
+
+
 def get_intel_ww(dt: Optional[datetime] = None) -> str:
     """
     Calculate Intel work week string (fiscal calendar).
@@ -44,35 +123,12 @@ def get_intel_ww(dt: Optional[datetime] = None) -> str:
     if dt is None:
         dt = datetime.now(timezone.utc)
     
-    # Get ISO calendar info
-    iso_year, iso_week, iso_weekday = dt.isocalendar()
+    # Work weeks only depend on the calendar date (this also lets aware and
+    # naive datetimes be handled alike)
+    day = dt.date() if isinstance(dt, datetime) else dt
     
-    # Intel fiscal year logic
-    # Find the Sunday closest to December 28 of the previous calendar year
-    dec_28 = datetime(iso_year - 1, 12, 28)
-    days_since_sunday = (dec_28.weekday() + 1) % 7
-    fiscal_year_start = dec_28 - timedelta(days=days_since_sunday)
-    
-    # Calculate days since fiscal year start
-    days_since_start = (dt - fiscal_year_start).days
-    
-    # Calculate work week number (1-based)
-    fiscal_week = (days_since_start // 7) + 1
-    
-    # Determine fiscal year
-    if dt < fiscal_year_start:
-        fiscal_year = iso_year - 1
-        # Recalculate for previous fiscal year
-        dec_28_prev = datetime(fiscal_year - 1, 12, 28)
-        days_since_sunday_prev = (dec_28_prev.weekday() + 1) % 7
-        fiscal_year_start_prev = dec_28_prev - timedelta(days=days_since_sunday_prev)
-        days_since_start_prev = (dt - fiscal_year_start_prev).days
-        fiscal_week = (days_since_start_prev // 7) + 1
-    else:
-        fiscal_year = iso_year
-    
-    ww_str = f"{fiscal_year}WW{fiscal_week:02d}"
-    logger.info(f"Calculated Intel work week: {ww_str} for date {dt.date()}")
+    ww_str = str(get_intel_ww_vec(np.array([day], dtype='datetime64[D]'))[0])
+    logger.info(f"Calculated Intel work week: {ww_str} for date {day}")
     return ww_str
 
 
@@ -90,14 +146,12 @@ def get_recent_work_weeks(num_weeks: int = 4) -> List[str]:
     List[str]
         List of work week strings, most recent first
     """
-    current_date = datetime.now(timezone.utc)
-    work_weeks = []
+    # One date per week, most recent first
+    current_date = datetime.now(timezone.utc).date()
+    week_dates = pd.date_range(end=current_date, periods=num_weeks, freq='7D')[::-1]
     
-    for i in range(num_weeks):
-        week_date = current_date - timedelta(weeks=i)
-        ww_str = get_intel_ww(week_date)
-        if ww_str not in work_weeks:  # Avoid duplicates
-            work_weeks.append(ww_str)
+    # Avoid duplicates, keeping most-recent-first order
+    work_weeks = list(dict.fromkeys(get_intel_ww_vec(week_dates.values).tolist()))
     
     logger.info(f"Generated {len(work_weeks)} recent work weeks: {work_weeks}")
     return work_weeks
@@ -107,6 +161,22 @@ def get_recent_work_weeks(num_weeks: int = 4) -> List[str]:
 # File Discovery
 # ============================================================================
 
+# Files found per (root_path, ww_str, file name or prefix) - the same work
+# weeks are resolved by several stages of a run. Only hits are cached, so a
+# file that arrives later is still picked up. The latest Counters file is
+# cached with its folder's modified time and rescanned when that changes.
+_FILE_CACHE: Dict[Tuple[str, str, str], object] = {}
+
+
+def invalidate_file_cache() -> None:
+    """
+    Clear cached file discovery results (e.g. after a config reload or when
+    new files are expected to have landed).
+    """
+    _FILE_CACHE.clear()
+    logger.debug("File discovery cache cleared")
+
+
 def find_entity_states_file(root_path: str, ww_str: str, file_name: str = "EntityStates.csv") -> Optional[Path]:
     """
     Find EntityStates.csv file in work week folder.
@@ -125,13 +195,17 @@ def find_entity_states_file(root_path: str, ww_str: str, file_name: str = "Entit
     Path or None
         Path to file if found, None otherwise
     """
-    root_dir = Path(root_path)
-    ww_folder = root_dir / ww_str
-    file_path = ww_folder / file_name
+    cache_key = (str(root_path), ww_str, file_name)
+    if cache_key in _FILE_CACHE:
+        return _FILE_CACHE[cache_key]
     
-    if file_path.exists():
+    # Plain string path and a single isfile() stat; a Path is only built on a hit
+    file_path = os.path.join(root_path, ww_str, file_name)
+    
+    if os.path.isfile(file_path):
         logger.info(f"Found EntityStates file: {file_path}")
-        return file_path
+        _FILE_CACHE[cache_key] = Path(file_path)
+        return _FILE_CACHE[cache_key]
     else:
         logger.warning(f"EntityStates file not found: {file_path}")
         return None
@@ -141,6 +215,12 @@ def find_latest_counters_file(root_path: str, ww_str: str, file_prefix: str = "C
     """
     Find the most recent Counters_*.csv file in work week folder based on file modified date.
     
+    The result is cached per folder together with the folder's modified time,
+    so a Counters file added to (or removed from) the folder later in a
+    long-lived process is picked up by the next call. Rewriting an existing
+    file in place does not change the folder's modified time; call
+    invalidate_file_cache() when files may have been overwritten.
+    
     Parameters
     ----------
     root_path : str
@@ -158,40 +238,56 @@ def find_latest_counters_file(root_path: str, ww_str: str, file_prefix: str = "C
     root_dir = Path(root_path)
     ww_folder = root_dir / ww_str
     
-    if not ww_folder.exists():
+    # One stat of the folder: its modified time changes when files are added
+    # or removed, which is what makes a cached result stale
+    try:
+        folder_mtime = ww_folder.stat().st_mtime_ns
+    except OSError:
         logger.warning(f"Work week folder not found: {ww_folder}")
         return None
     
-    # Find all files matching prefix
-    counter_files = list(ww_folder.glob(f"{file_prefix}*.csv"))
-    
-    if not counter_files:
+    cache_key = (str(root_path), ww_str, file_prefix)
+    cached = _FILE_CACHE.get(cache_key)
+    if cached is not None and cached[0] == folder_mtime:
+        return cached[1]
+    
+    # Single directory pass: DirEntry caches the stat result, and only the
+    # running maximum is kept instead of sorting every file
+    # (fnmatch follows the OS case rules, like Path.glob)
+    pattern = f"{file_prefix}*.csv"
+    files_found = 0
+    most_recent_entry = None
+    most_recent_mtime = None
+    
+    with os.scandir(ww_folder) as entries:
+        for entry in entries:
+            if not fnmatch.fnmatch(entry.name, pattern):
+                continue
+            files_found += 1
+            try:
+                modified_time = entry.stat().st_mtime
+            except Exception as e:
+                logger.error(f"Error getting modified time for {entry.path}: {e}")
+                continue
+            if most_recent_mtime is None or modified_time > most_recent_mtime:
+                most_recent_entry = entry
+                most_recent_mtime = modified_time
+    
+    if not files_found:
         logger.warning(f"No Counters files found in {ww_folder} with prefix '{file_prefix}'")
         return None
     
-    # Get file modified times
-    file_times = []
-    for file_path in counter_files:
-        try:
-            modified_time = os.path.getmtime(file_path)
-            modified_dt = datetime.fromtimestamp(modified_time, tz=timezone.utc)
-            file_times.append((file_path, modified_dt))
-        except Exception as e:
-            logger.error(f"Error getting modified time for {file_path}: {e}")
-            continue
-    
-    if not file_times:
+    if most_recent_entry is None:
         logger.warning(f"Could not get modified times for any Counters files in {ww_folder}")
         return None
     
-    # Sort by modified time (most recent first)
-    file_times.sort(key=lambda x: x[1], reverse=True)
+    most_recent_file = Path(most_recent_entry.path)
+    most_recent_time = datetime.fromtimestamp(most_recent_mtime, tz=timezone.utc)
     
-    most_recent_file, most_recent_time = file_times[0]
-    
-    logger.info(f"Found {len(file_times)} Counters files in {ww_folder}")
+    logger.info(f"Found {files_found} Counters files in {ww_folder}")
     logger.info(f"Selected most recent: {most_recent_file.name} (modified: {most_recent_time})")
     
+    _FILE_CACHE[cache_key] = (folder_mtime, (most_recent_file, most_recent_time))
     return most_recent_file, most_recent_time
 
 
@@ -223,7 +319,7 @@ def normalize_entity_name(entity: str, pattern: str = "_PC", replacement: str =
     normalized = str(entity).replace(pattern, replacement)
     
     if normalized != entity:
-        logger.debug(f"Normalized entity: {entity} -> {normalized}")
+        logger.debug("Normalized entity: %s -> %s", entity, normalized)
     
     return normalized
 
@@ -232,6 +328,10 @@ def apply_entity_normalization(df: pd.DataFrame, config: Dict, entity_column: st
     """
     Apply entity normalization to a DataFrame.
     
+    The caller's DataFrame is not modified: when names change, a shallow
+    copy with the new entity column is returned (other columns share memory
+    with the input); otherwise the input is returned as is.
+    
     Parameters
     ----------
     df : pd.DataFrame
@@ -251,14 +351,38 @@ def apply_entity_normalization(df: pd.DataFrame, config: Dict, entity_column: st
         replacement = config['entity_normalization']['replacement']
         
         original_count = len(df)
-        entities_changed = df[entity_column] != df[entity_column].str.replace(pattern, replacement)
-        changed_count = entities_changed.sum()
+        entities = df[entity_column]
         
-        df[entity_column] = df[entity_column].apply(
-            lambda x: normalize_entity_name(x, pattern, replacement)
-        )
+        # Entity names repeat heavily (one row per tool per day/state), so
+        # the string work is done once per distinct name and mapped back
+        # through the integer codes (missing entities get code -1 and stay
+        # missing)
+        codes, unique_entities = pd.factorize(entities)
+        unique_entities = pd.Index(unique_entities)
+        to_change = np.zeros(len(unique_entities), dtype=bool)
+        if len(unique_entities):
+            # One replace pass; the names that changed are found by comparing
+            # against the originals rather than a separate contains() pass
+            normalized = np.asarray(unique_entities.str.replace(pattern, replacement, regex=False), dtype=object)
+            to_change = normalized != np.asarray(unique_entities, dtype=object)
         
-        logger.info(f"Entity normalization: {changed_count} of {original_count} entities changed ({pattern} -> {replacement})")
+        if to_change.any():
+            rows_to_change = (codes >= 0) & to_change[codes]
+            changed_count = int(rows_to_change.sum())
+            
+            df = df.copy(deep=False)
+            if isinstance(entities.dtype, pd.CategoricalDtype):
+                # Categorical entities (read with a 'category' dtype) get new
+                # categories from the normalized names - the row codes are
+                # remapped, no per-row strings are built
+                normalized_categorical = pd.Categorical(normalized)
+                new_codes = np.where(codes >= 0, normalized_categorical.codes[codes], -1)
+                df[entity_column] = pd.Categorical.from_codes(
+                    new_codes, categories=normalized_categorical.categories
+                )
+            else:
+                df[entity_column] = entities.mask(rows_to_change, normalized[codes])
+            logger.info(f"Entity normalization: {changed_count} of {original_count} entities changed ({pattern} -> {replacement})")
     
     return df
 
@@ -267,11 +391,68 @@ def apply_entity_normalization(df: pd.DataFrame, config: Dict, entity_column: st
 # FAB_ENTITY Key Creation
 # ============================================================================
 
+def is_arrow_string(series: pd.Series) -> bool:
+    """
+    Check whether a column holds Arrow-backed strings.
+    
+    Parameters
+    ----------
+    series : pd.Series
+        Column to check
+    
+    Returns
+    -------
+    bool
+        True for pyarrow string dtypes (ArrowDtype or string[pyarrow])
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.ArrowDtype):
+        return str(dtype.pyarrow_dtype) in ('string', 'large_string')
+    return isinstance(dtype, pd.StringDtype) and dtype.storage.startswith('pyarrow')
+
+
+def join_keys_by_pair(left: pd.Series, right: pd.Series, sep: str = '_') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Join two label columns with a separator, once per distinct pair.
+    
+    Parameters
+    ----------
+    left : pd.Series
+        First label column
+    right : pd.Series
+        Second label column
+    sep : str
+        Separator
+    
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        (codes, keys): keys holds the distinct joined strings in sorted order
+        and keys[codes] is the joined value of each row. Missing values are
+        rendered as 'nan', as with astype(str).
+    """
+    left_codes, left_uniques = pd.factorize(left)
+    right_codes, right_uniques = pd.factorize(right)
+    left_labels = np.append(np.asarray(left_uniques.astype(str), dtype=object), 'nan')  # [-1] -> 'nan'
+    right_labels = np.append(np.asarray(right_uniques.astype(str), dtype=object), 'nan')
+    
+    pair_base = len(right_uniques) + 1
+    pair_codes, unique_pairs = pd.factorize(left_codes.astype(np.int64) * pair_base + (right_codes + 1))
+    pair_keys = left_labels[unique_pairs // pair_base] + sep + right_labels[unique_pairs % pair_base - 1]
+    
+    # Different pairs can still spell the same key (e.g. 'A_B' + 'C' and
+    # 'A' + 'B_C'); keys are sorted so a categorical orders like plain strings
+    key_codes, unique_keys = pd.factorize(pair_keys, sort=True)
+    return key_codes[pair_codes], np.asarray(unique_keys, dtype=object)
+
+
 def create_fab_entity_key(df: pd.DataFrame, fab_column: str = 'FAB', entity_column: str = 'ENTITY') -> pd.DataFrame:
     """
     Create FAB_ENTITY composite key column.
     
-    Combines FAB and ENTITY with underscore separator.
+    Combines FAB and ENTITY with underscore separator. Returns a shallow copy
+    with the new column; the caller's DataFrame is not modified and the
+    existing columns share memory with it.
     
     Parameters
     ----------
@@ -287,10 +468,36 @@ def create_fab_entity_key(df: pd.DataFrame, fab_column: str = 'FAB', entity_colu
     pd.DataFrame
         DataFrame with new FAB_ENTITY column
     """
-    df['FAB_ENTITY'] = df[fab_column].astype(str) + '_' + df[entity_column].astype(str)
+    df = df.copy(deep=False)
+    fab = df[fab_column]
+    entity = df[entity_column]
+    
+    if is_arrow_string(fab) and is_arrow_string(entity):
+        # Arrow-backed strings (dtype_backend: pyarrow) are joined in one Arrow
+        # kernel instead of being converted to Python objects first
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        
+        fab_array = pa.array(fab)
+        string_type = fab_array.type  # string or large_string
+        joined = pc.binary_join_element_wise(
+            fab_array, pa.array(entity).cast(string_type), pa.scalar('_', type=string_type),
+            null_handling='replace', null_replacement='nan'
+        )
+        df['FAB_ENTITY'] = pd.Series(pd.arrays.ArrowExtensionArray(joined), index=df.index)
+    else:
+        # FAB/ENTITY pairs repeat on every row of a tool, so each distinct
+        # pair's key is concatenated once and the rows take it by code
+        # (categorical inputs give a categorical key)
+        key_codes, unique_keys = join_keys_by_pair(fab, entity)
+        if isinstance(fab.dtype, pd.CategoricalDtype) or isinstance(entity.dtype, pd.CategoricalDtype):
+            df['FAB_ENTITY'] = pd.Categorical.from_codes(key_codes, categories=unique_keys)
+        else:
+            df['FAB_ENTITY'] = unique_keys[key_codes]
     
     logger.info(f"Created FAB_ENTITY key from {fab_column} and {entity_column}")
-    logger.debug(f"Sample FAB_ENTITY values: {df['FAB_ENTITY'].head(3).tolist()}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Sample FAB_ENTITY values: %s", df['FAB_ENTITY'].head(3).tolist())
     
     return df
 
@@ -299,7 +506,47 @@ def create_fab_entity_key(df: pd.DataFrame, fab_column: str = 'FAB', entity_colu
 # DataFrame Utilities
 # ============================================================================
 
-def load_csv_safe(file_path: Path, expected_columns: Optional[List[str]] = None) -> pd.DataFrame:
+def read_csv_arrow(file_path: Path):
+    """
+    Read a CSV file into an Arrow table with the multithreaded pyarrow reader.
+    
+    pyarrow does not fail on invalid UTF-8 - such columns come back as
+    binary - so a binary column triggers a single latin-1 re-read.
+    
+    Parameters
+    ----------
+    file_path : Path
+        Path to CSV file
+    
+    Returns
+    -------
+    pyarrow.Table
+        Parsed table
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    
+    # Empty strings are missing values, as with pandas.read_csv
+    convert_options = pacsv.ConvertOptions(strings_can_be_null=True)
+    
+    table = pacsv.read_csv(
+        file_path,
+        read_options=pacsv.ReadOptions(encoding='utf-8'),
+        convert_options=convert_options
+    )
+    if any(pa.types.is_binary(field.type) for field in table.schema):
+        logger.warning(f"UTF-8 decode failed, trying latin-1 encoding")
+        table = pacsv.read_csv(
+            file_path,
+            read_options=pacsv.ReadOptions(encoding='latin-1'),
+            convert_options=convert_options
+        )
+    
+    return table
+
+
+def load_csv_safe(file_path: Path, expected_columns: Optional[List[str]] = None,
+                  dtype_backend: Optional[str] = None, dtypes: Optional[Dict[str, str]] = None) -> pd.DataFrame:
     """
     Safely load CSV file with error handling and column validation.
     
@@ -309,6 +556,14 @@ def load_csv_safe(file_path: Path, expected_columns: Optional[List[str]] = None)
         Path to CSV file
     expected_columns : List[str], optional
         List of expected column names
+    dtype_backend : str, optional
+        'pyarrow' to parse with the pyarrow CSV reader into Arrow-backed
+        columns (requires pyarrow); default NumPy-backed columns otherwise
+    dtypes : dict, optional
+        Column name -> dtype for the default reader (e.g. 'str', 'float64',
+        'category'), so those columns skip type inference; columns missing
+        from the file are ignored. Not used with dtype_backend='pyarrow',
+        whose reader types columns natively.
     
     Returns
     -------
@@ -317,18 +572,28 @@ def load_csv_safe(file_path: Path, expected_columns: Optional[List[str]] = None)
     """
     logger.info(f"Loading CSV: {file_path}")
     
-    try:
-        df = pd.read_csv(file_path, encoding='utf-8')
-    except UnicodeDecodeError:
-        logger.warning(f"UTF-8 decode failed, trying latin-1 encoding")
-        df = pd.read_csv(file_path, encoding='latin-1')
+    if dtype_backend == 'pyarrow':
+        table = read_csv_arrow(file_path)
+        columns = table.column_names
+        num_rows = table.num_rows
+    else:
+        read_kwargs = {'engine': 'c', 'low_memory': False}
+        if dtypes:
+            read_kwargs['dtype'] = dtypes
+        try:
+            df = pd.read_csv(file_path, encoding='utf-8', **read_kwargs)
+        except UnicodeDecodeError:
+            logger.warning(f"UTF-8 decode failed, trying latin-1 encoding")
+            df = pd.read_csv(file_path, encoding='latin-1', **read_kwargs)
+        columns = df.columns
+        num_rows = len(df)
     
-    logger.info(f"Loaded {len(df)} rows, {len(df.columns)} columns")
+    logger.info(f"Loaded {num_rows} rows, {len(columns)} columns")
     
     # Validate expected columns
     if expected_columns:
-        missing_cols = set(expected_columns) - set(df.columns)
-        extra_cols = set(df.columns) - set(expected_columns)
+        missing_cols = set(expected_columns) - set(columns)
+        extra_cols = set(columns) - set(expected_columns)
         
         if missing_cols:
             logger.warning(f"Missing expected columns: {missing_cols}")
@@ -336,13 +601,64 @@ def load_csv_safe(file_path: Path, expected_columns: Optional[List[str]] = None)
         if extra_cols:
             logger.info(f"Extra columns found (dynamic part counters): {len(extra_cols)} columns")
     
+    if dtype_backend == 'pyarrow':
+        # Arrow buffers are released column by column as they are converted
+        df = table.to_pandas(types_mapper=pd.ArrowDtype, self_destruct=True)
+    
     return df
 
 
-def add_metadata_columns(df: pd.DataFrame, source_file: str, load_ww: str, load_ts: Optional[datetime] = None) -> pd.DataFrame:
+# Load timestamp shared by every DataFrame of a pipeline run, so all rows
+# loaded in one run carry the same load_ts (set once at pipeline start)
+_RUN_LOAD_TS: Optional[datetime] = None
+_RUN_LOAD_TS_ISO: Optional[str] = None
+
+
+def set_run_load_ts(dt: Optional[datetime] = None) -> datetime:
+    """
+    Set the load timestamp used for metadata columns for the rest of the run.
+    
+    Parameters
+    ----------
+    dt : datetime, optional
+        Run load timestamp (defaults to current UTC time)
+    
+    Returns
+    -------
+    datetime
+        The run load timestamp
+    """
+    global _RUN_LOAD_TS, _RUN_LOAD_TS_ISO
+    
+    _RUN_LOAD_TS = dt if dt is not None else datetime.now(timezone.utc)
+    _RUN_LOAD_TS_ISO = _RUN_LOAD_TS.isoformat()
+    logger.debug("Run load timestamp set to %s", _RUN_LOAD_TS_ISO)
+    
+    return _RUN_LOAD_TS
+
+
+def get_run_load_ts() -> datetime:
+    """
+    Get the run load timestamp (current UTC time if no run timestamp is set).
+    
+    Returns
+    -------
+    datetime
+        Load timestamp
+    """
+    return _RUN_LOAD_TS if _RUN_LOAD_TS is not None else datetime.now(timezone.utc)
+
+
+def add_metadata_columns(df: pd.DataFrame, source_file: str, load_ww: str, load_ts: Optional[datetime] = None,
+                         extra_columns: Optional[Dict] = None) -> pd.DataFrame:
     """
     Add standard metadata columns to DataFrame.
     
+    Metadata values are constant for a file, so string values are stored as
+    single-category categoricals (one small integer code per row) rather than
+    an object column repeating the same string. A new DataFrame is returned;
+    the caller's DataFrame is not modified and its columns are not copied.
+    
     Parameters
     ----------
     df : pd.DataFrame
@@ -352,21 +668,51 @@ def add_metadata_columns(df: pd.DataFrame, source_file: str, load_ww: str, load_
     load_ww : str
         Work week string
     load_ts : datetime, optional
-        Load timestamp (defaults to current UTC time)
+        Load timestamp (defaults to the run load timestamp if one is set,
+        otherwise current UTC time)
+    extra_columns : dict, optional
+        Additional constant columns (name -> value) to add in the same step
     
     Returns
     -------
     pd.DataFrame
         DataFrame with metadata columns added
     """
-    if load_ts is None:
-        load_ts = datetime.now(timezone.utc)
-    
-    df['source_file'] = source_file
-    df['load_ww'] = load_ww
-    df['load_ts'] = load_ts.isoformat()
-    
-    logger.debug(f"Added metadata columns: source_file={source_file}, load_ww={load_ww}, load_ts={load_ts}")
+    if load_ts is not None:
+        load_ts_str = load_ts.isoformat()
+    elif _RUN_LOAD_TS_ISO is not None:
+        load_ts_str = _RUN_LOAD_TS_ISO
+    else:
+        load_ts_str = datetime.now(timezone.utc).isoformat()
+    
+    metadata = {
+        'source_file': source_file,
+        'load_ww': load_ww,
+        'load_ts': load_ts_str
+    }
+    if extra_columns:
+        metadata.update(extra_columns)
+    
+    # Built as one small frame and attached in a single concat, so wide
+    # Counters frames get no per-column inserts (and no fragmentation)
+    metadata_df = pd.DataFrame(
+        {
+            column: (
+                pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), categories=[value])
+                if isinstance(value, str) else value
+            )
+            for column, value in metadata.items()
+        },
+        index=df.index
+    )
+    
+    existing_columns = [column for column in metadata if column in df.columns]
+    if existing_columns:
+        df = df.drop(columns=existing_columns)
+    
+    df = pd.concat([df, metadata_df], axis=1, copy=False)
+    
+    logger.debug("Added metadata columns: source_file=%s, load_ww=%s, load_ts=%s", source_file, load_ww, load_ts_str)
     
     return df
 
@@ -388,5 +734,5 @@ def adjust_timestamp(dt: datetime, days: int) -> datetime:
         Adjusted timestamp
     """
     adjusted = dt + timedelta(days=days)
-    logger.debug(f"Adjusted timestamp: {dt} -> {adjusted} ({days:+d} days)")
+    logger.debug("Adjusted timestamp: %s -> %s (%+d days)", dt, adjusted, days)
     return adjusted
@@ -9,7 +9,10 @@ Provides comprehensive audit trail logging for:
 - Data quality issues
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -37,7 +40,12 @@ def setup_logger(name: str = __name__, level: str = 'INFO', log_file: str = None
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, level.upper()))
     
-    # Remove existing handlers
+    # Remove existing handlers (stopping any file listener from a previous setup)
+    previous_listener = getattr(logger, 'queue_listener', None)
+    if previous_listener is not None:
+        atexit.unregister(previous_listener.stop)
+        previous_listener.stop()
+        logger.queue_listener = None
     logger.handlers = []
     
     # Create formatters
@@ -65,7 +73,18 @@ def setup_logger(name: str = __name__, level: str = 'INFO', log_file: str = None
         file_handler = logging.FileHandler(log_path, mode='a', encoding='utf-8')
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(detailed_formatter)
-        logger.addHandler(file_handler)
+        
+        # Logging calls only enqueue the record; a background listener thread
+        # does the file writes (stopped - and flushed - at interpreter exit)
+        log_queue = queue.Queue(-1)
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.setLevel(logging.DEBUG)
+        logger.addHandler(queue_handler)
+        
+        listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        logger.queue_listener = listener
         
         logger.info(f"Logging to file: {log_path}")
     
@@ -77,82 +96,134 @@ class WaferProductionLogger:
     Specialized logger for wafer production calculation audit trail.
     """
     
+    __slots__ = ('logger', 'config')
+    
     def __init__(self, logger: logging.Logger, config: dict):
         self.logger = logger
         self.config = config.get('wafer_production_logging', {})
     
+    def is_enabled(self, setting: str, level: int) -> bool:
+        """
+        Check whether a log line would be written, so callers can skip
+        collecting per-row values for it.
+        
+        Parameters
+        ----------
+        setting : str or None
+            wafer_production_logging setting for the line (None = always on)
+        level : int
+            Logging level of the line
+        
+        Returns
+        -------
+        bool
+            True if the setting is on and the level is enabled
+        """
+        return (setting is None or self.config.get(setting, True)) and self.logger.isEnabledFor(level)
+    
     def log_counter_search(self, entity: str, date: str, keywords_tried: list):
         """Log counter keyword search process."""
-        if self.config.get('log_counter_used', True):
-            self.logger.debug(f"Entity {entity} ({date}): Searching for counters with keywords: {keywords_tried}")
+        if not self.config.get('log_counter_used', True) or not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        self.logger.debug("Entity %s (%s): Searching for counters with keywords: %s", entity, date, keywords_tried)
     
     def log_counter_found(self, entity: str, date: str, column_name: str, value: float, keyword: str):
         """Log when counter is found."""
-        if self.config.get('log_counter_used', True):
-            self.logger.info(f"Entity {entity} ({date}): Using counter '{column_name}' (keyword: '{keyword}', value: {value})")
+        if not self.config.get('log_counter_used', True) or not self.logger.isEnabledFor(logging.INFO):
+            return
+        self.logger.info(
+            "Entity %s (%s): Using counter '%s' (keyword: '%s', value: %s)",
+            entity, date, column_name, keyword, value
+        )
     
     def log_no_counter_found(self, entity: str, date: str, keywords_tried: list):
         """Log when no counter is found."""
-        if self.config.get('log_no_counter_found', True):
-            self.logger.warning(f"Entity {entity} ({date}): No counter found with keywords: {keywords_tried}")
+        if not self.config.get('log_no_counter_found', True) or not self.logger.isEnabledFor(logging.WARNING):
+            return
+        self.logger.warning("Entity %s (%s): No counter found with keywords: %s", entity, date, keywords_tried)
     
     def log_negative_change(self, entity: str, date: str, counter: str, prev_value: float, curr_value: float, change: float):
         """Log negative counter changes."""
-        if self.config.get('log_negative_changes', True):
-            self.logger.warning(
-                f"Entity {entity} ({date}): Negative change in {counter}: "
-                f"{prev_value} -> {curr_value} (change: {change})"
-            )
+        if not self.config.get('log_negative_changes', True) or not self.logger.isEnabledFor(logging.WARNING):
+            return
+        self.logger.warning(
+            "Entity %s (%s): Negative change in %s: %s -> %s (change: %s)",
+            entity, date, counter, prev_value, curr_value, change
+        )
     
     def log_part_replacement(self, entity: str, date: str, counter: str, last_value: float, new_value: float, threshold: float):
         """Log detected part replacement."""
-        if self.config.get('log_replacements', True):
-            self.logger.info(
-                f"PART REPLACEMENT DETECTED - Entity {entity} ({date}): "
-                f"{counter} dropped from {last_value} to {new_value} "
-                f"(threshold: {threshold})"
-            )
+        if not self.config.get('log_replacements', True) or not self.logger.isEnabledFor(logging.INFO):
+            return
+        self.logger.info(
+            "PART REPLACEMENT DETECTED - Entity %s (%s): %s dropped from %s to %s (threshold: %s)",
+            entity, date, counter, last_value, new_value, threshold
+        )
     
     def log_fallback_used(self, entity: str, date: str, primary_keyword: str, fallback_keyword: str, reason: str):
         """Log when fallback counter is used."""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         self.logger.info(
-            f"Entity {entity} ({date}): Fallback counter used - "
-            f"'{primary_keyword}' failed ({reason}), using '{fallback_keyword}'"
+            "Entity %s (%s): Fallback counter used - '%s' failed (%s), using '%s'",
+            entity, date, primary_keyword, reason, fallback_keyword
         )
     
     def log_wafer_calculation(self, entity: str, date: str, counter_change: float, running_hours: float, wafers_per_hour: float):
         """Log final wafer calculation."""
+        # Checked up front so the per-row call costs nothing unless DEBUG is enabled
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
         self.logger.debug(
-            f"Entity {entity} ({date}): Wafer calculation - "
-            f"Counter change: {counter_change}, Running hours: {running_hours}, "
-            f"Wafers/hr: {wafers_per_hour:.2f}"
+            "Entity %s (%s): Wafer calculation - "
+            "Counter change: %s, Running hours: %s, Wafers/hr: %.2f",
+            entity, date, counter_change, running_hours, wafers_per_hour
         )
 
 
 class StateLogger:
     """
     Specialized logger for entity state classification.
+    
+    Bagged tools and unknown states are logged once per entity-day (and
+    state), however often they are reported.
     """
     
+    __slots__ = ('logger', 'config', 'logged_events')
+    
     def __init__(self, logger: logging.Logger, config: dict):
         self.logger = logger
         self.config = config.get('state_logging', {})
+        self.logged_events = set()
     
     def log_unknown_state(self, entity: str, state: str, date: str):
         """Log unknown entity states."""
-        if self.config.get('log_unknown_states', True):
-            self.logger.warning(f"Entity {entity} ({date}): Unknown state '{state}' encountered")
+        if not self.config.get('log_unknown_states', True) or not self.logger.isEnabledFor(logging.WARNING):
+            return
+        event = ('unknown', entity, state, date)
+        if event in self.logged_events:
+            return
+        self.logged_events.add(event)
+        self.logger.warning("Entity %s (%s): Unknown state '%s' encountered", entity, date, state)
     
     def log_bagged_tool(self, entity: str, date: str):
         """Log when tool is marked as bagged."""
-        if self.config.get('log_bagged_tools', True):
-            self.logger.info(f"Entity {entity} ({date}): Tool marked as BAGGED")
+        if not self.config.get('log_bagged_tools', True) or not self.logger.isEnabledFor(logging.INFO):
+            return
+        event = ('bagged', entity, date)
+        if event in self.logged_events:
+            return
+        self.logged_events.add(event)
+        self.logger.info("Entity %s (%s): Tool marked as BAGGED", entity, date)
     
     def log_state_classification(self, entity: str, date: str, running_hrs: float, idle_hrs: float, down_hrs: float):
         """Log state hour classification."""
+        # Checked up front so the per-row call costs nothing unless DEBUG is enabled
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
         self.logger.debug(
-            f"Entity {entity} ({date}): State hours - "
-            f"Running: {running_hrs:.2f}, Idle: {idle_hrs:.2f}, Down: {down_hrs:.2f}"
+            "Entity %s (%s): State hours - Running: %.2f, Idle: %.2f, Down: %.2f",
+            entity, date, running_hrs, idle_hrs, down_hrs
         )
 
 
@@ -6,6 +6,8 @@ Loads EntityStates.csv files from work week folders into raw bronze table.
 Features:
 - Discovers EntityStates.csv in WW folders
 - Loads last 4 weeks of historical data
+- Reads weekly files concurrently
+- Streams files straight to SQL Server while later files are still parsing
 - Applies entity normalization (PC -> PM)
 - Creates FAB_ENTITY key
 - Adds metadata columns
@@ -14,9 +16,13 @@ Features:
 
 import pandas as pd
 import logging
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
 import yaml
 
 # Import helper functions
@@ -27,9 +33,11 @@ from utils.helpers import (
     apply_entity_normalization,
     create_fab_entity_key,
     load_csv_safe,
-    add_metadata_columns
+    add_metadata_columns,
+    get_run_load_ts
 )
 from utils.logger import setup_logger
+from utils.database_engine import SQLServerEngine
 
 logger = logging.getLogger(__name__)
 
@@ -95,7 +103,7 @@ class EntityStatesIngestion:
         self.logger.info(f"Discovered {len(files_to_process)} EntityStates files to process")
         return files_to_process
     
-    def load_single_file(self, ww_str: str, file_path: Path) -> pd.DataFrame:
+    def load_single_file(self, ww_str: str, file_path: Path, load_ts: Optional[datetime] = None) -> pd.DataFrame:
         """
         Load a single EntityStates.csv file.
         
@@ -105,6 +113,9 @@ class EntityStatesIngestion:
             Work week string
         file_path : Path
             Path to CSV file
+        load_ts : datetime, optional
+            Load timestamp (defaults to the run load timestamp if one is set,
+            otherwise current UTC time)
         
         Returns
         -------
@@ -113,38 +124,183 @@ class EntityStatesIngestion:
         """
         self.logger.info(f"Loading EntityStates file for {ww_str}: {file_path}")
         
-        # Load CSV
-        expected_cols = self.entity_states_config['expected_columns']
-        df = load_csv_safe(file_path, expected_columns=expected_cols)
+        chunk_rows = self.entity_states_config.get('chunk_rows')
+        if chunk_rows and self.source_config.get('dtype_backend') != 'pyarrow':
+            # Large files: parse and process in bounded chunks
+            df = self.load_file_in_chunks(file_path, chunk_rows)
+        else:
+            # Load CSV
+            expected_cols = self.entity_states_config['expected_columns']
+            df = load_csv_safe(
+                file_path,
+                expected_columns=expected_cols,
+                dtype_backend=self.source_config.get('dtype_backend'),
+                dtypes=self.entity_states_config.get('dtypes')
+            )
+            
+            # Validate required columns exist
+            self.validate_required_columns(df)
+            
+            self.logger.info(f"Loaded {len(df)} rows from {file_path.name}")
+            
+            # Apply entity normalization (PC -> PM)
+            df = apply_entity_normalization(df, self.config, entity_column='ENTITY')
+            
+            # Create FAB_ENTITY key
+            df = create_fab_entity_key(df, fab_column='FAB', entity_column='ENTITY')
+        
+        # Add metadata columns, including load_date (date when data was collected;
+        # stored as datetime64 like counter_date, not an object column of dates)
+        if load_ts is None:
+            load_ts = get_run_load_ts()
+        df = add_metadata_columns(
+            df,
+            source_file=file_path.name,
+            load_ww=ww_str,
+            load_ts=load_ts,
+            extra_columns={'load_date': pd.Timestamp(load_ts.date())}
+        )
         
-        # Validate required columns exist
+        # Deduplicate within the file first (keep last occurrence), so the
+        # combined frame only has to resolve duplicates across weeks
+        before_dedup = len(df)
+        df = df.drop_duplicates(subset=['FAB_ENTITY', 'DAY_SHIFT', 'ENTITY_STATE'], keep='last')
+        if before_dedup > len(df):
+            self.logger.info(f"Removed {before_dedup - len(df)} duplicate rows within {file_path.name}")
+        
+        return df
+    
+    def validate_required_columns(self, df: pd.DataFrame):
+        """
+        Raise if a column required by the Silver calculations is missing.
+        
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Loaded EntityStates data
+        """
         required_cols = ['FAB', 'ENTITY', 'ENTITY_STATE', 'HOURS_IN_STATE']
         missing_required = set(required_cols) - set(df.columns)
         if missing_required:
             raise ValueError(f"Missing required columns: {missing_required}")
+    
+    def load_file_in_chunks(self, file_path: Path, chunk_rows: int) -> pd.DataFrame:
+        """
+        Load an EntityStates file in chunks of chunk_rows rows.
         
-        self.logger.info(f"Loaded {len(df)} rows from {file_path.name}")
+        Each chunk is normalized, keyed and deduplicated as soon as it is
+        parsed, so the parser buffers and the intermediate string columns
+        never cover more than one chunk.
         
-        # Apply entity normalization (PC -> PM)
-        df = apply_entity_normalization(df, self.config, entity_column='ENTITY')
+        Parameters
+        ----------
+        file_path : Path
+            Path to CSV file
+        chunk_rows : int
+            Rows per chunk
         
-        # Create FAB_ENTITY key
-        df = create_fab_entity_key(df, fab_column='FAB', entity_column='ENTITY')
+        Returns
+        -------
+        pd.DataFrame
+            Normalized and keyed DataFrame (metadata columns not yet added)
+        """
+        self.logger.info(f"Loading CSV in chunks of {chunk_rows} rows: {file_path}")
         
-        # Add metadata columns
-        df = add_metadata_columns(
-            df,
-            source_file=file_path.name,
-            load_ww=ww_str,
-            load_ts=datetime.now(timezone.utc)
-        )
+        # Categories would differ from chunk to chunk - those columns are read
+        # as str and converted once the chunks are combined
+        dtypes = self.entity_states_config.get('dtypes') or {}
+        chunk_dtypes = {column: ('str' if dtype == 'category' else dtype) for column, dtype in dtypes.items()}
+        category_columns = [column for column, dtype in dtypes.items() if dtype == 'category']
+        
+        for encoding in ('utf-8', 'latin-1'):
+            try:
+                chunks = []
+                with pd.read_csv(file_path, encoding=encoding, chunksize=chunk_rows,
+                                 dtype=chunk_dtypes or None, engine='c') as reader:
+                    for chunk in reader:
+                        self.validate_required_columns(chunk)
+                        chunk = apply_entity_normalization(chunk, self.config, entity_column='ENTITY')
+                        chunk = create_fab_entity_key(chunk, fab_column='FAB', entity_column='ENTITY')
+                        chunks.append(
+                            chunk.drop_duplicates(subset=['FAB_ENTITY', 'DAY_SHIFT', 'ENTITY_STATE'], keep='last')
+                        )
+                break
+            except UnicodeDecodeError:
+                if encoding == 'latin-1':
+                    raise
+                self.logger.warning(f"UTF-8 decode failed, trying latin-1 encoding")
+        
+        df = chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True, copy=False)
         
-        # Add load_date column (date when data was collected)
-        # Parse from DAY_SHIFT column if possible, otherwise use load_ts
-        df['load_date'] = datetime.now(timezone.utc).date()
+        for column in category_columns:
+            if column in df.columns:
+                df[column] = df[column].astype('category')
+        
+        self.logger.info(f"Loaded {len(df)} rows from {file_path.name} ({len(chunks)} chunks)")
         
         return df
     
+    def iter_single_files(self, mode: str = 'full') -> Iterator[pd.DataFrame]:
+        """
+        Load EntityStates files one at a time, in discovery order.
+        
+        Files are read concurrently, but only a small window of files is in
+        flight at once, so memory stays bounded by a few files rather than
+        the whole history. Each yielded frame is already deduplicated within
+        its file. Every file read in one call carries the same load_ts.
+        
+        Parameters
+        ----------
+        mode : str
+            'full' or 'incremental'
+        
+        Yields
+        ------
+        pd.DataFrame
+            Processed DataFrame for one EntityStates file
+        """
+        # Discover files
+        files_to_process = self.discover_files(mode)
+        
+        if not files_to_process:
+            self.logger.warning("No EntityStates files found to process")
+            return
+        
+        # One load timestamp for every file of this load, so server-side
+        # deduplication falls through to load_ww rather than ranking rows by
+        # which file happened to finish parsing first (also when no pipeline
+        # run timestamp has been set, e.g. standalone streaming)
+        load_ts = get_run_load_ts()
+        
+        max_workers = min(4, len(files_to_process))
+        pending_files = iter(files_to_process)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = deque()
+            
+            def submit_next() -> None:
+                next_file = next(pending_files, None)
+                if next_file is not None:
+                    ww_str, file_path = next_file
+                    in_flight.append((file_path, executor.submit(self.load_single_file, ww_str, file_path, load_ts)))
+            
+            for _ in range(max_workers):
+                submit_next()
+            
+            # Results are consumed in discovery order so "last occurrence"
+            # keeps the same meaning as a sequential read
+            while in_flight:
+                file_path, future = in_flight.popleft()
+                submit_next()
+                
+                try:
+                    df = future.result()
+                except Exception as e:
+                    self.logger.error(f"Error loading {file_path}: {e}")
+                    continue
+                
+                yield df
+    
     def load_all_files(self, mode: str = 'full') -> pd.DataFrame:
         """
         Load all EntityStates files.
@@ -161,47 +317,120 @@ class EntityStatesIngestion:
         """
         self.logger.info(f"Starting EntityStates ingestion (mode: {mode})")
         
-        # Discover files
-        files_to_process = self.discover_files(mode)
-        
-        if not files_to_process:
-            self.logger.warning("No EntityStates files found to process")
-            return pd.DataFrame()
-        
-        # Load all files
-        all_dfs = []
-        for ww_str, file_path in files_to_process:
-            try:
-                df = self.load_single_file(ww_str, file_path)
-                all_dfs.append(df)
-            except Exception as e:
-                self.logger.error(f"Error loading {file_path}: {e}")
-                continue
+        all_dfs = list(self.iter_single_files(mode))
         
         if not all_dfs:
             self.logger.error("No EntityStates files loaded successfully")
             return pd.DataFrame()
         
-        # Combine all DataFrames
-        combined_df = pd.concat(all_dfs, ignore_index=True)
-        
-        # Remove duplicates before loading to database
-        # Deduplicate on: FAB_ENTITY + DAY_SHIFT + ENTITY_STATE
-        # Keep the most recent load (last occurrence)
-        before_dedup = len(combined_df)
-        combined_df = combined_df.drop_duplicates(
-            subset=['FAB_ENTITY', 'DAY_SHIFT', 'ENTITY_STATE'],
-            keep='last'
-        )
-        after_dedup = len(combined_df)
-        
-        if before_dedup > after_dedup:
-            self.logger.info(f"Removed {before_dedup - after_dedup} duplicate rows before database load")
+        # Combine all DataFrames (a single file - the usual incremental run -
+        # is already deduplicated and is used as is, no copy)
+        if len(all_dfs) == 1:
+            combined_df = all_dfs[0].reset_index(drop=True)
+        else:
+            combined_df = pd.concat(all_dfs, ignore_index=True, copy=False)
+            
+            # Remove duplicates across files before loading to database
+            # Deduplicate on: FAB_ENTITY + DAY_SHIFT + ENTITY_STATE
+            # Keep the most recent load (last occurrence)
+            before_dedup = len(combined_df)
+            combined_df = combined_df.drop_duplicates(
+                subset=['FAB_ENTITY', 'DAY_SHIFT', 'ENTITY_STATE'],
+                keep='last'
+            )
+            after_dedup = len(combined_df)
+            
+            if before_dedup > after_dedup:
+                self.logger.info(f"Removed {before_dedup - after_dedup} duplicate rows across files before database load")
         
         self.logger.info(f"EntityStates ingestion complete: {len(combined_df)} total rows from {len(all_dfs)} files")
         
         return combined_df
     
+    def stream_to_sqlserver(self, mode: str = 'full',
+                            table_params_key: str = 'ENTITY_STATES_SQLSERVER_OUTPUT') -> int:
+        """
+        Load EntityStates files and insert them into SQL Server as they are parsed.
+        
+        A consumer thread inserts each file while the next ones are being read
+        (at most two parsed files wait in the queue). Cross-file duplicates are
+        removed server-side afterwards for the work weeks just loaded: the most
+        recent load of each FAB_ENTITY + DAY_SHIFT + ENTITY_STATE is kept, and
+        within one run the row from the file read last (the oldest work week)
+        wins, as in load_all_files.
+        
+        Parameters
+        ----------
+        mode : str
+            'full' or 'incremental'
+        table_params_key : str
+            Key for table parameters in config
+        
+        Returns
+        -------
+        int
+            Number of rows inserted
+        """
+        self.logger.info(f"Starting streaming EntityStates ingestion (mode: {mode})")
+        
+        engine = SQLServerEngine(self.config, table_params_key)
+        frames: queue.Queue = queue.Queue(maxsize=2)
+        rows_inserted = 0
+        load_errors = []
+        
+        def insert_frames() -> None:
+            nonlocal rows_inserted
+            while True:
+                df = frames.get()
+                if df is None:
+                    break
+                if load_errors:
+                    continue  # Drain the queue after a failure
+                try:
+                    rows_inserted += engine.load_dataframe(df, if_exists='append')
+                except Exception as e:
+                    load_errors.append(e)
+        
+        consumer = threading.Thread(target=insert_frames, name='entity-states-sqlserver-loader')
+        consumer.start()
+        
+        loaded_weeks = []
+        try:
+            for df in self.iter_single_files(mode):
+                if load_errors:
+                    break
+                if df.empty:
+                    continue
+                loaded_weeks.append(df['load_ww'].iat[0])
+                frames.put(df)
+        finally:
+            frames.put(None)
+            consumer.join()
+        
+        if load_errors:
+            self.logger.error(f"Streaming EntityStates load failed after {rows_inserted} rows")
+            raise load_errors[0]
+        
+        if not loaded_weeks:
+            self.logger.error("No EntityStates files loaded successfully")
+            return 0
+        
+        duplicates_removed = engine.delete_duplicates(
+            key_columns=['FAB_ENTITY', 'DAY_SHIFT', 'ENTITY_STATE'],
+            order_columns=['load_ts'],
+            filter_column='load_ww',
+            filter_values=sorted(set(loaded_weeks)),
+            ascending_order_columns=['load_ww']
+        )
+        if duplicates_removed:
+            self.logger.info(f"Removed {duplicates_removed} duplicate rows from {engine.table_name}")
+        
+        self.logger.info(
+            f"Streaming EntityStates ingestion complete: {rows_inserted} rows from {len(loaded_weeks)} files"
+        )
+        
+        return rows_inserted - duplicates_removed
+    
     def run(self, mode: str = 'full') -> pd.DataFrame:
         """
         Main entry point for EntityStates ingestion.
@@ -239,6 +468,29 @@ def run_entity_states_ingestion(config: Dict, mode: str = 'full') -> pd.DataFram
     return ingestion.run(mode)
 
 
+def stream_entity_states_to_sqlserver(config: Dict, mode: str = 'full',
+                                      table_params_key: str = 'ENTITY_STATES_SQLSERVER_OUTPUT') -> int:
+    """
+    Standalone function to stream EntityStates files into SQL Server.
+    
+    Parameters
+    ----------
+    config : dict
+        Configuration dictionary
+    mode : str
+        'full' or 'incremental'
+    table_params_key : str
+        Key for table parameters in config
+    
+    Returns
+    -------
+    int
+        Number of rows loaded
+    """
+    ingestion = EntityStatesIngestion(config)
+    return ingestion.stream_to_sqlserver(mode, table_params_key)
+
+
 if __name__ == "__main__":
     # Test script
     import sys
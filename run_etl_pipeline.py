@@ -16,14 +16,17 @@ Arguments:
 
 import argparse
 import yaml
+import pandas as pd
 import logging
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Tuple
 import sys
 
 # Import Bronze layer modules
-from etl.bronze.entity_states_ingestion import run_entity_states_ingestion
-from etl.bronze.counters_ingestion import run_counters_ingestion
+from etl.bronze.entity_states_ingestion import run_entity_states_ingestion, stream_entity_states_to_sqlserver
+from etl.bronze.counters_ingestion import run_counters_ingestion, stream_counters_to_sqlserver
 
 # Import Silver layer modules
 from etl.silver.enrichment import run_silver_enrichment
@@ -33,6 +36,7 @@ from etl.gold.aggregations import create_gold_facts
 
 # Import utilities
 from utils.logger import setup_logger, create_run_log_file
+from utils.helpers import invalidate_file_cache, set_run_load_ts
 from utils.database_engine import load_to_sqlserver
 
 # Setup logging
@@ -80,7 +84,7 @@ class EntityCountersETL:
         
         return config
     
-    def run_bronze_layer(self, mode: str = 'full'):
+    def run_bronze_layer(self, mode: str = 'full', stream_to_sqlserver: bool = False):
         """
         Run Bronze layer ingestion.
         
@@ -88,46 +92,185 @@ class EntityCountersETL:
         ----------
         mode : str
             'full' or 'incremental'
+        stream_to_sqlserver : bool
+            Insert EntityStates and Counters files into SQL Server as they are
+            parsed instead of building combined DataFrames (no DataFrames are
+            returned)
         """
         logger.info("")
         logger.info("=" * 80)
         logger.info(f"BRONZE LAYER - {mode.upper()} MODE")
         logger.info("=" * 80)
         
-        # Ingest EntityStates
-        logger.info("Step 1/2: EntityStates Ingestion")
-        entity_states_df = run_entity_states_ingestion(self.config, mode=mode)
+        # EntityStates and Counters are independent: both are ingested on
+        # worker threads, and whichever finishes first is loaded to SQL Server
+        # while the other is still parsing
+        logger.info("Steps 1-2: EntityStates and Counters Ingestion (concurrent)")
+        entity_states_df = None
+        counters_df = None
+        
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            if stream_to_sqlserver:
+                entity_states_future = executor.submit(stream_entity_states_to_sqlserver, self.config, mode=mode)
+                counters_future = executor.submit(stream_counters_to_sqlserver, self.config, mode=mode)
+            else:
+                entity_states_future = executor.submit(run_entity_states_ingestion, self.config, mode=mode)
+                counters_future = executor.submit(run_counters_ingestion, self.config, mode=mode)
+            
+            for future in as_completed([entity_states_future, counters_future]):
+                label = 'EntityStates' if future is entity_states_future else 'Counters'
+                if stream_to_sqlserver:
+                    # Streamed files are already in SQL Server
+                    logger.info(f"{label}: {future.result()} rows loaded to SQL Server")
+                elif future is entity_states_future:
+                    entity_states_df = future.result()
+                    self.load_bronze_table(entity_states_df, 'ENTITY_STATES_SQLSERVER_OUTPUT', label)
+                else:
+                    counters_df = future.result()
+                    self.load_bronze_table(counters_df, 'COUNTERS_SQLSERVER_OUTPUT', label)
+        
+        if not stream_to_sqlserver:
+            self.write_bronze_cache(entity_states_df, counters_df, mode)
         
-        if not entity_states_df.empty:
-            rows_loaded = load_to_sqlserver(
-                entity_states_df,
-                self.config,
-                'ENTITY_STATES_SQLSERVER_OUTPUT',
-                if_exists='append'
-            )
-            logger.info(f"EntityStates: {rows_loaded} rows loaded to SQL Server")
-        else:
-            logger.warning("EntityStates: No data to load")
+        logger.info("BRONZE LAYER COMPLETE")
         
-        # Ingest Counters
-        logger.info("Step 2/2: Counters Ingestion")
-        counters_df = run_counters_ingestion(self.config, mode=mode)
+        return entity_states_df, counters_df
+    
+    def load_bronze_table(self, df, table_params_key: str, label: str):
+        """
+        Load one Bronze DataFrame to its SQL Server table.
         
-        if not counters_df.empty:
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Ingested data
+        table_params_key : str
+            Key for table parameters in config
+        label : str
+            Dataset name for log messages
+        """
+        if not df.empty:
             rows_loaded = load_to_sqlserver(
-                counters_df,
+                df,
                 self.config,
-                'COUNTERS_SQLSERVER_OUTPUT',
+                table_params_key,
                 if_exists='append'
             )
-            logger.info(f"Counters: {rows_loaded} rows loaded to SQL Server")
+            logger.info(f"{label}: {rows_loaded} rows loaded to SQL Server")
         else:
-            logger.warning("Counters: No data to load")
+            logger.warning(f"{label}: No data to load")
+    
+    def bronze_cache_paths(self, mode: str) -> Tuple[Path, Path]:
+        """
+        Get the Bronze cache file paths for a refresh mode.
         
-        logger.info("BRONZE LAYER COMPLETE")
+        Parameters
+        ----------
+        mode : str
+            'full' or 'incremental'
+        
+        Returns
+        -------
+        Tuple[Path, Path]
+            (entity_states_path, counters_path)
+        """
+        cache_dir = Path(self.config.get('bronze_cache', {}).get('cache_dir', 'cache/bronze'))
+        return cache_dir / f'entity_states_{mode}.parquet', cache_dir / f'counters_{mode}.parquet'
+    
+    def write_bronze_cache(self, entity_states_df, counters_df, mode: str):
+        """
+        Write Bronze output to Parquet for later Silver/Gold-only runs.
+        
+        Only done when bronze_cache.use_bronze_parquet_cache is enabled. The
+        cache is a shortcut, so a failed write is logged and the run goes on.
+        
+        Parameters
+        ----------
+        entity_states_df : pd.DataFrame
+            EntityStates Bronze data
+        counters_df : pd.DataFrame
+            Counters Bronze data
+        mode : str
+            'full' or 'incremental'
+        """
+        if not self.config.get('bronze_cache', {}).get('use_bronze_parquet_cache', False):
+            return
         
+        entity_states_path, counters_path = self.bronze_cache_paths(mode)
+        try:
+            entity_states_path.parent.mkdir(parents=True, exist_ok=True)
+            entity_states_df.to_parquet(entity_states_path, compression='zstd', index=False)
+            counters_df.to_parquet(counters_path, compression='zstd', index=False)
+            logger.info(f"Bronze data cached to {entity_states_path.parent}")
+        except Exception as e:
+            logger.warning(f"Could not write Bronze cache: {e}")
+            entity_states_path.unlink(missing_ok=True)
+            counters_path.unlink(missing_ok=True)
+    
+    def read_bronze_cache(self, mode: str):
+        """
+        Read Bronze data cached by an earlier run, if enabled and fresh.
+        
+        Parameters
+        ----------
+        mode : str
+            'full' or 'incremental'
+        
+        Returns
+        -------
+        Tuple[pd.DataFrame, pd.DataFrame] or None
+            (entity_states_df, counters_df), or None if there is no usable cache
+        """
+        cache_config = self.config.get('bronze_cache', {})
+        if not cache_config.get('use_bronze_parquet_cache', False):
+            return None
+        
+        entity_states_path, counters_path = self.bronze_cache_paths(mode)
+        if not (entity_states_path.exists() and counters_path.exists()):
+            logger.info("No Bronze cache found")
+            return None
+        
+        max_age_seconds = cache_config.get('max_age_hours', 24) * 3600
+        cache_age_seconds = datetime.now().timestamp() - min(
+            entity_states_path.stat().st_mtime, counters_path.stat().st_mtime
+        )
+        if cache_age_seconds > max_age_seconds:
+            logger.info(f"Bronze cache is older than {cache_config.get('max_age_hours', 24)} hours, ignoring it")
+            return None
+        
+        try:
+            entity_states_df = pd.read_parquet(entity_states_path)
+            counters_df = pd.read_parquet(counters_path)
+        except Exception as e:
+            logger.warning(f"Could not read Bronze cache: {e}")
+            return None
+        
+        logger.info(f"Loaded Bronze data from cache: {len(entity_states_df)} EntityStates rows, "
+                    f"{len(counters_df)} Counters rows")
         return entity_states_df, counters_df
     
+    def get_bronze_data(self, mode: str = 'full'):
+        """
+        Get Bronze data for Silver, from the Bronze cache or by running Bronze.
+        
+        Parameters
+        ----------
+        mode : str
+            'full' or 'incremental'
+        
+        Returns
+        -------
+        Tuple[pd.DataFrame, pd.DataFrame]
+            (entity_states_df, counters_df)
+        """
+        cached = self.read_bronze_cache(mode)
+        if cached is not None:
+            return cached
+        
+        # No usable cache - re-run Bronze ingestion (reading the Bronze tables
+        # back from SQL Server is not implemented)
+        return self.run_bronze_layer(mode)
+    
     def run_silver_layer(self, entity_states_df=None, counters_df=None, mode: str = 'full'):
         """
         Run Silver layer enrichment.
@@ -149,9 +292,7 @@ class EntityCountersETL:
         # If data not provided, load from Bronze tables
         if entity_states_df is None or counters_df is None:
             logger.info("Loading data from Bronze tables...")
-            # TODO: Implement Bronze table loading
-            # For now, re-run Bronze ingestion
-            entity_states_df, counters_df = self.run_bronze_layer(mode)
+            entity_states_df, counters_df = self.get_bronze_data(mode)
         
         # Run enrichment
         state_hours_df, production_df, replacements_df = run_silver_enrichment(
@@ -205,7 +346,7 @@ class EntityCountersETL:
             logger.info("Loading data from Silver tables...")
             # TODO: Implement Silver table loading
             # For now, re-run Silver enrichment
-            entity_states_df, counters_df = self.run_bronze_layer(mode)
+            entity_states_df, counters_df = self.get_bronze_data(mode)
             state_hours_df, production_df, _ = self.run_silver_layer(entity_states_df, counters_df, mode)
         
         # Create Gold facts
@@ -250,6 +391,12 @@ class EntityCountersETL:
         logger.info(f"Running layer(s): {layer}")
         logger.info(f"Mode: {mode}")
         
+        # Each run discovers files afresh (discovery is cached within a run)
+        invalidate_file_cache()
+        
+        # One load_ts for every row loaded by this run
+        set_run_load_ts()
+        
         try:
             if layer == 'all':
                 # Run all layers in sequence
@@ -262,7 +409,10 @@ class EntityCountersETL:
                 )
             
             elif layer == 'bronze':
-                self.run_bronze_layer(mode)
+                # Nothing downstream needs the Bronze DataFrames (unless they
+                # are cached for later Silver/Gold runs)
+                use_cache = self.config.get('bronze_cache', {}).get('use_bronze_parquet_cache', False)
+                self.run_bronze_layer(mode, stream_to_sqlserver=not use_cache)
             
             elif layer == 'silver':
                 self.run_silver_layer(mode=mode)
@@ -22,6 +22,9 @@ from utils.logger import StateLogger
 
 logger = logging.getLogger(__name__)
 
+# State categories, in the order of the state hour columns
+STATE_CATEGORIES = ['Bagged', 'Down', 'Idle', 'Running']
+
 
 class StateHoursCalculator:
     """
@@ -43,6 +46,10 @@ class StateHoursCalculator:
         self.idle_states = self.state_config['idle_states']
         self.bagged_state = self.state_config['bagged_state']
         
+        # Set versions of the state lists for the membership tests
+        self.running_state_set = frozenset(self.running_states)
+        self.idle_state_set = frozenset(self.idle_states)
+        
         # Initialize specialized logger
         self.state_logger = StateLogger(logger, config['logging'])
         
@@ -51,90 +58,42 @@ class StateHoursCalculator:
         logger.info(f"Idle states: {self.idle_states}")
         logger.info(f"Bagged state: {self.bagged_state}")
     
-    def parse_day_shift_to_date(self, day_shift: str) -> Optional[datetime.date]:
+    def parse_day_shift_dates(self, day_shift: pd.Series) -> pd.Series:
         """
-        Parse DAY_SHIFT column to extract date.
+        Parse DAY_SHIFT column to extract dates.
         
         Expected formats:
         - MM/DD-shift
         - MM/DD/YY-shift
         - MM/DD/YYYY-shift
         
-        Parameters
-        ----------
-        day_shift : str
-            DAY_SHIFT value
-        
-        Returns
-        -------
-        datetime.date or None
-            Parsed date
-        """
-        if pd.isna(day_shift):
-            return None
-        
-        try:
-            # Extract date part (before dash)
-            date_part = day_shift.split('-')[0]
-            
-            # Try different date formats
-            for fmt in ['%m/%d/%Y', '%m/%d/%y', '%m/%d']:
-                try:
-                    parsed = datetime.strptime(date_part, fmt)
-                    # If year not in format, assume current year
-                    if fmt == '%m/%d':
-                        current_year = datetime.now().year
-                        parsed = parsed.replace(year=current_year)
-                    return parsed.date()
-                except ValueError:
-                    continue
-            
-            logger.warning(f"Could not parse DAY_SHIFT: {day_shift}")
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error parsing DAY_SHIFT '{day_shift}': {e}")
-            return None
-    
-    def classify_state(self, entity_state: str, entity: str, date: str) -> str:
-        """
-        Classify entity state into Running/Idle/Down/Bagged category.
+        Each format is parsed over the whole column; the first format that
+        matches a value wins (MM/DD assumes the current year).
         
         Parameters
         ----------
-        entity_state : str
-            State value
-        entity : str
-            Entity name
-        date : str
-            Date
+        day_shift : pd.Series
+            DAY_SHIFT values
         
         Returns
         -------
-        str
-            'Running', 'Idle', 'Down', or 'Bagged'
+        pd.Series
+            Parsed dates (datetime64, NaT where no format matches)
         """
-        if pd.isna(entity_state):
-            return 'Down'
-        
-        state = str(entity_state).strip()
+        # Extract date part (before dash)
+        date_part = day_shift.astype('string').str.split('-', n=1).str[0]
         
-        # Check for bagged
-        if state == self.bagged_state:
-            self.state_logger.log_bagged_tool(entity, date)
-            return 'Bagged'
+        full_year = pd.to_datetime(date_part, format='%m/%d/%Y', errors='coerce')
+        short_year = pd.to_datetime(date_part, format='%m/%d/%y', errors='coerce')
+        no_year = pd.to_datetime(date_part, format='%m/%d', errors='coerce')
         
-        # Check for running states
-        if state in self.running_states:
-            return 'Running'
-        
-        # Check for idle states
-        if state in self.idle_states:
-            return 'Idle'
+        # If year not in format, assume current year
+        no_year = pd.to_datetime(
+            pd.DataFrame({'year': datetime.now().year, 'month': no_year.dt.month, 'day': no_year.dt.day}),
+            errors='coerce'
+        )
         
-        # Everything else is down
-        self.state_logger.log_unknown_state(entity, state, date)
-        return 'Down'
+        return full_year.fillna(short_year).fillna(no_year)
     
     def calculate_daily_state_hours(self, entity_states_df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -152,77 +111,114 @@ class StateHoursCalculator:
         """
         logger.info("Starting state hours calculation")
         
-        # Parse DAY_SHIFT to get date
-        entity_states_df = entity_states_df.copy()
-        entity_states_df['state_date'] = entity_states_df['DAY_SHIFT'].apply(self.parse_day_shift_to_date)
+        # Parse DAY_SHIFT to get date (kept as datetime64 so Silver/Gold
+        # consumers can use .dt without re-parsing)
+        state_date = self.parse_day_shift_dates(entity_states_df['DAY_SHIFT'])
         
-        # Filter out rows where date could not be parsed
+        # Filter out rows where date could not be parsed; the working frame is
+        # built in one step with only the columns used below (the input frame
+        # is never copied or modified)
+        has_date = state_date.notna().to_numpy()
         before_filter = len(entity_states_df)
-        entity_states_df = entity_states_df[entity_states_df['state_date'].notna()].copy()
+        entity_states_df = entity_states_df.loc[
+            has_date, ['ENTITY', 'FAB', 'FAB_ENTITY', 'ENTITY_STATE', 'HOURS_IN_STATE']
+        ].assign(state_date=state_date.to_numpy()[has_date])
         after_filter = len(entity_states_df)
         
         if before_filter > after_filter:
             logger.warning(f"Filtered out {before_filter - after_filter} rows with unparseable dates")
         
-        # Classify states
-        entity_states_df['state_category'] = entity_states_df.apply(
-            lambda row: self.classify_state(row['ENTITY_STATE'], row['ENTITY'], str(row['state_date'])),
-            axis=1
+        # Classify states into Running/Idle/Down/Bagged in one vectorized pass
+        # (missing states are Down; bagged takes precedence over the state lists;
+        # everything else is Down)
+        states = entity_states_df['ENTITY_STATE'].astype('string').str.strip()
+        is_missing = states.isna().to_numpy()
+        is_bagged = states.eq(self.bagged_state).fillna(False).to_numpy(dtype=bool)
+        is_running = states.isin(self.running_state_set).to_numpy(dtype=bool)
+        is_idle = states.isin(self.idle_state_set).to_numpy(dtype=bool)
+        is_unknown = ~(is_missing | is_bagged | is_running | is_idle)
+        
+        # Stored as a categorical with all four categories, so every state
+        # column exists after the unstack below even if a state never occurs
+        category_codes = np.select(
+            [is_missing, is_bagged, is_running, is_idle],
+            [STATE_CATEGORIES.index(category) for category in ['Down', 'Bagged', 'Running', 'Idle']],
+            default=STATE_CATEGORIES.index('Down')
+        )
+        entity_states_df['state_category'] = pd.Categorical.from_codes(category_codes, categories=STATE_CATEGORIES)
+        
+        # Log bagged tools and unknown states once per entity-day (and state)
+        if is_bagged.any() and self.state_logger.config.get('log_bagged_tools', True):
+            bagged_days = entity_states_df.loc[is_bagged, ['ENTITY', 'state_date']].drop_duplicates()
+            for entity, state_date in bagged_days.itertuples(index=False, name=None):
+                self.state_logger.log_bagged_tool(entity, str(state_date.date()))
+        
+        if is_unknown.any() and self.state_logger.config.get('log_unknown_states', True):
+            unknown_days = (
+                entity_states_df.loc[is_unknown, ['ENTITY', 'state_date']]
+                .assign(state=states[is_unknown])
+                .drop_duplicates()
+            )
+            for entity, state_date, state in unknown_days.itertuples(index=False, name=None):
+                self.state_logger.log_unknown_state(entity, state, str(state_date.date()))
+        
+        # Aggregate hours by entity, date, and state category, then unstack
+        # to one column per state category (observed=True: ENTITY/FAB may be
+        # categoricals - only combinations present in the data are kept; the
+        # reindex adds back state categories that never occurred)
+        state_hours_pivot = (
+            entity_states_df.groupby(
+                ['ENTITY', 'FAB', 'FAB_ENTITY', 'state_date', 'state_category'], observed=True
+            )['HOURS_IN_STATE'].sum()
+            .unstack('state_category', fill_value=0.0)
+            .reindex(columns=STATE_CATEGORIES, fill_value=0.0)
         )
         
-        # Aggregate hours by entity, date, and state category
-        state_hours = entity_states_df.groupby(
-            ['ENTITY', 'FAB', 'FAB_ENTITY', 'state_date', 'state_category']
-        )['HOURS_IN_STATE'].sum().reset_index()
-        
-        # Pivot to get columns for each state category
-        state_hours_pivot = state_hours.pivot_table(
-            index=['ENTITY', 'FAB', 'FAB_ENTITY', 'state_date'],
-            columns='state_category',
-            values='HOURS_IN_STATE',
-            fill_value=0
-        ).reset_index()
-        
-        # Ensure all state columns exist
-        for state in ['Running', 'Idle', 'Down', 'Bagged']:
-            if state not in state_hours_pivot.columns:
-                state_hours_pivot[state] = 0
+        # Rows are unique per ENTITY/FAB/FAB_ENTITY/state_date, so ENTITY and
+        # state_date can only repeat if an entity appears under more than one
+        # FAB/FAB_ENTITY. Rows are sorted by ENTITY first, so that shows up as
+        # a FAB or FAB_ENTITY change between neighbouring rows of one entity
+        # (integer code compares, no hashing of the whole frame)
+        entity_codes, fab_codes, fab_entity_codes = state_hours_pivot.index.codes[:3]
+        same_entity = entity_codes[1:] == entity_codes[:-1]
+        has_fab_conflict = bool((
+            same_entity & ((fab_codes[1:] != fab_codes[:-1]) | (fab_entity_codes[1:] != fab_entity_codes[:-1]))
+        ).any())
         
         # Rename columns to lowercase with underscore
-        state_hours_pivot = state_hours_pivot.rename(columns={
-            'Running': 'running_hours',
-            'Idle': 'idle_hours',
-            'Down': 'down_hours',
-            'Bagged': 'bagged_hours'
-        })
+        state_hours_pivot.columns = [f"{state.lower()}_hours" for state in STATE_CATEGORIES]
+        state_hours_pivot = state_hours_pivot.reset_index()
         
         # Calculate total hours and bagged flag
-        state_hours_pivot['total_hours'] = (
-            state_hours_pivot['running_hours'] + 
-            state_hours_pivot['idle_hours'] + 
-            state_hours_pivot['down_hours'] +
-            state_hours_pivot['bagged_hours']
-        )
+        # (one row-wise reduction over the four float columns, added in the
+        # same order as before)
+        hour_columns = ['running_hours', 'idle_hours', 'down_hours', 'bagged_hours']
+        state_hours_pivot['total_hours'] = state_hours_pivot[hour_columns].to_numpy(dtype=np.float64).sum(axis=1)
         
         state_hours_pivot['is_bagged'] = state_hours_pivot['bagged_hours'] > 0
         
-        # Log state classifications
-        for _, row in state_hours_pivot.iterrows():
-            self.state_logger.log_state_classification(
-                row['ENTITY'], 
-                str(row['state_date']), 
-                row['running_hours'], 
-                row['idle_hours'], 
-                row['down_hours']
-            )
-        
-        # Remove duplicates based on ENTITY and state_date
-        before_dedup = len(state_hours_pivot)
-        state_hours_pivot = state_hours_pivot.drop_duplicates(subset=['ENTITY', 'state_date'], keep='last')
-        after_dedup = len(state_hours_pivot)
-        
-        if before_dedup > after_dedup:
-            logger.info(f"Removed {before_dedup - after_dedup} duplicate rows")
+        # Log state classifications (one line per entity-day, so opt-in and
+        # only when DEBUG output is enabled)
+        if (self.state_logger.config.get('log_per_row_classification', False)
+                and logger.isEnabledFor(logging.DEBUG)):
+            classification_rows = state_hours_pivot[
+                ['ENTITY', 'state_date', 'running_hours', 'idle_hours', 'down_hours']
+            ].itertuples(index=False, name=None)
+            for entity, state_date, running_hrs, idle_hrs, down_hrs in classification_rows:
+                self.state_logger.log_state_classification(
+                    entity, str(state_date.date()), running_hrs, idle_hrs, down_hrs
+                )
+        
+        # Remove duplicates based on ENTITY and state_date (only possible when
+        # an entity appears under more than one FAB)
+        if has_fab_conflict:
+            logger.warning("Some entities appear under more than one FAB/FAB_ENTITY")
+            before_dedup = len(state_hours_pivot)
+            state_hours_pivot = state_hours_pivot.drop_duplicates(subset=['ENTITY', 'state_date'], keep='last')
+            after_dedup = len(state_hours_pivot)
+            
+            if before_dedup > after_dedup:
+                logger.info(f"Removed {before_dedup - after_dedup} duplicate rows")
         
         logger.info(f"State hours calculation complete: {len(state_hours_pivot)} entity-days")
         logger.info(f"Bagged tools: {state_hours_pivot['is_bagged'].sum()}")
@@ -0,0 +1,95 @@
+"""
+Tests for Gold Aggregations - weekly fact tables
+=================================================
+The weekly builders are checked against small hand-computed frames,
+including a week that spans the turn of the year.
+"""
+
+import numpy as np
+import pandas as pd
+
+from etl.gold.aggregations import GoldAggregations
+
+
+def test_work_week_key_uses_iso_year():
+    dates = pd.Series(pd.to_datetime(['2024-12-29', '2024-12-30', '2025-01-05', '2025-01-06', None]))
+    
+    yearww = GoldAggregations.work_week_key(dates)
+    
+    assert yearww.astype(object).where(yearww.notna(), None).tolist() == [
+        '2024WW52', '2025WW01', '2025WW01', '2025WW02', None
+    ]
+
+
+def test_create_weekly_production_fact_hand_computed(config):
+    daily_fact = pd.DataFrame([
+        ('E1', '2024-12-30', 100.0, 10.0, True),
+        ('E1', '2025-01-02', 200.0, 20.0, False),
+        ('E1', '2025-01-06', 300.0, 30.0, False),
+        ('E2', '2025-01-06', 50.0, 0.0, False)
+    ], columns=['ENTITY', 'production_date', 'wafers_produced', 'running_hours', 'part_replacement_detected'])
+    daily_fact['production_date'] = pd.to_datetime(daily_fact['production_date'])
+    daily_fact['FAB'] = 'F28'
+    daily_fact['FAB_ENTITY'] = 'F28_' + daily_fact['ENTITY']
+    daily_fact['idle_hours'] = 1.0
+    daily_fact['down_hours'] = 2.0
+    daily_fact['bagged_hours'] = 0.0
+    daily_fact['total_hours'] = daily_fact['running_hours'] + 3.0
+    
+    weekly_fact = GoldAggregations(config).create_weekly_production_fact(daily_fact)
+    
+    weekly_fact = weekly_fact.astype({col: object for col in ['ENTITY', 'FAB', 'FAB_ENTITY', 'YEARWW']})
+    expected = pd.DataFrame([
+        ('E1', 'F28', 'F28_E1', '2025WW01', 300.0, 30.0, 2.0, 4.0, 0.0, 36.0, 1,
+         '2024-12-30', '2025-01-02', 2, 10.0),
+        ('E1', 'F28', 'F28_E1', '2025WW02', 300.0, 30.0, 1.0, 2.0, 0.0, 33.0, 0,
+         '2025-01-06', '2025-01-06', 1, 10.0),
+        ('E2', 'F28', 'F28_E2', '2025WW02', 50.0, 0.0, 1.0, 2.0, 0.0, 3.0, 0,
+         '2025-01-06', '2025-01-06', 1, np.nan)
+    ], columns=[
+        'ENTITY', 'FAB', 'FAB_ENTITY', 'YEARWW',
+        'total_wafers_produced', 'total_running_hours', 'total_idle_hours', 'total_down_hours',
+        'total_bagged_hours', 'total_hours', 'part_replacements_count',
+        'week_start_date', 'week_end_date', 'days_with_data', 'avg_wafers_per_hour'
+    ])
+    expected['week_start_date'] = pd.to_datetime(expected['week_start_date'])
+    expected['week_end_date'] = pd.to_datetime(expected['week_end_date'])
+    pd.testing.assert_frame_equal(
+        weekly_fact.drop(columns='calculation_timestamp').reset_index(drop=True), expected, check_dtype=False
+    )
+
+
+def test_create_state_hours_weekly_fact_hand_computed(config):
+    daily_state_fact = pd.DataFrame([
+        ('E1', '2025-01-05', 12.0, 6.0, 6.0, 0.0, False),
+        ('E1', '2025-01-06', 6.0, 6.0, 0.0, 12.0, True),
+        ('E1', '2025-01-07', 0.0, 0.0, 0.0, 0.0, False)
+    ], columns=['ENTITY', 'state_date', 'running_hours', 'idle_hours', 'down_hours', 'bagged_hours', 'is_bagged'])
+    daily_state_fact['state_date'] = pd.to_datetime(daily_state_fact['state_date'])
+    daily_state_fact['FAB'] = 'F28'
+    daily_state_fact['FAB_ENTITY'] = 'F28_E1'
+    daily_state_fact['total_hours'] = daily_state_fact[
+        ['running_hours', 'idle_hours', 'down_hours', 'bagged_hours']
+    ].sum(axis=1)
+    
+    weekly_fact = GoldAggregations(config).create_state_hours_weekly_fact(daily_state_fact)
+    
+    weekly_fact = weekly_fact.astype({col: object for col in ['ENTITY', 'FAB', 'FAB_ENTITY', 'YEARWW']})
+    expected = pd.DataFrame([
+        # 2025-01-05 is a Sunday - the last day of ISO week 1
+        ('E1', 'F28', 'F28_E1', '2025WW01', 12.0, 6.0, 6.0, 0.0, 24.0, False,
+         '2025-01-05', '2025-01-05', 1, 50.0, 25.0, 25.0),
+        # 24 hours in week 2: 6 running, 6 idle, 0 down (12 bagged)
+        ('E1', 'F28', 'F28_E1', '2025WW02', 6.0, 6.0, 0.0, 12.0, 24.0, True,
+         '2025-01-06', '2025-01-07', 2, 25.0, 25.0, 0.0)
+    ], columns=[
+        'ENTITY', 'FAB', 'FAB_ENTITY', 'YEARWW',
+        'total_running_hours', 'total_idle_hours', 'total_down_hours', 'total_bagged_hours', 'total_hours',
+        'was_bagged_any_day', 'week_start_date', 'week_end_date', 'days_with_data',
+        'running_pct', 'idle_pct', 'down_pct'
+    ])
+    expected['week_start_date'] = pd.to_datetime(expected['week_start_date'])
+    expected['week_end_date'] = pd.to_datetime(expected['week_end_date'])
+    pd.testing.assert_frame_equal(
+        weekly_fact.drop(columns='calculation_timestamp').reset_index(drop=True), expected, check_dtype=False
+    )
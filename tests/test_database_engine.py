@@ -0,0 +1,169 @@
+"""
+Tests for Database Engine - BULK INSERT file
+=============================================
+The bulk load file is checked through a stand-in connection that records
+the statements executed and reads the file when BULK INSERT is issued.
+"""
+
+import re
+import sqlite3
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyodbc', exc_type=ImportError)
+
+from utils.database_engine import SQLServerEngine
+
+
+class RecordingCursor:
+    """Cursor stand-in reporting a server major version and capturing bulk files."""
+    
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+        self.fast_executemany = False
+    
+    def execute(self, sql, *params):
+        self.connection.statements.append(sql)
+        match = re.search(r"BULK INSERT #bulk_stage FROM '([^']+)'", sql)
+        if match:
+            with open(match.group(1), encoding='utf-8', newline='') as f:
+                self.connection.files.append(f.read())
+        if sql.lstrip().startswith('INSERT INTO'):
+            self.rowcount = len(self.connection.files[-1].split('\n')) - 1
+        return self
+    
+    def executemany(self, sql, rows):
+        self.connection.executemany_rows.extend(rows)
+    
+    def fetchone(self):
+        return (self.connection.major_version,)
+
+
+class RecordingConnection:
+    """Connection stand-in for SQLServerEngine.get_connection."""
+    
+    def __init__(self, major_version):
+        self.major_version = major_version
+        self.statements = []
+        self.files = []
+        self.executemany_rows = []
+    
+    def cursor(self):
+        return RecordingCursor(self)
+    
+    def commit(self):
+        pass
+    
+    def rollback(self):
+        pass
+    
+    def close(self):
+        pass
+
+
+def make_engine(tmp_path, monkeypatch, major_version, table_name='counters'):
+    config = {'table_parameters': {'T': {'sqlserver': {
+        'server': 'server', 'database': 'db', 'schema': 'dbo', 'table_name': table_name,
+        'bulk_load_path': str(tmp_path), 'bulk_load_threshold': 1
+    }}}}
+    engine = SQLServerEngine(config, 'T')
+    connection = RecordingConnection(major_version)
+    monkeypatch.setattr(engine, 'get_connection', lambda: connection)
+    return engine, connection
+
+
+def test_bulk_file_keeps_fractional_seconds_and_writes_bits_as_0_1(tmp_path, monkeypatch):
+    engine, connection = make_engine(tmp_path, monkeypatch, major_version=14)
+    df = pd.DataFrame({
+        'load_ts': pd.to_datetime(['2025-01-01 10:00:00.123456', '2025-01-01 10:00:01.000000']),
+        'is_bagged': [True, False],
+        'part_replacement_detected': pd.array([True, None], dtype='boolean'),
+        'is_valid': pd.Series([False, True], dtype=object)
+    })
+    
+    rows_inserted = engine.bulk_load_dataframe(df)
+    
+    assert rows_inserted == 2
+    assert connection.files == [
+        '2025-01-01 10:00:00.123456\x011\x011\x010\n'
+        '2025-01-01 10:00:01.000000\x010\x01\x011\n'
+    ]
+    assert list(tmp_path.iterdir()) == []
+    # The caller's frame is not converted
+    assert df['is_bagged'].dtype == bool
+
+
+def test_bulk_insert_uses_csv_format_on_sql_server_2017(tmp_path, monkeypatch):
+    engine, connection = make_engine(tmp_path, monkeypatch, major_version=14)
+    df = pd.DataFrame({'ENTITY': ['E1', 'E"2', 'E\n3'], 'value': [1.5, None, 2.0]})
+    
+    engine.load_dataframe(df)
+    
+    bulk_sql = next(sql for sql in connection.statements if 'BULK INSERT' in sql)
+    assert "FORMAT = 'CSV', FIELDQUOTE = '\"'" in bulk_sql
+    assert connection.files == ['E1\x011.5\n"E""2"\x01\n"E\n3"\x012.0\n']
+    assert connection.executemany_rows == []
+
+
+def test_older_servers_fall_back_when_values_contain_terminators(tmp_path, monkeypatch):
+    engine, connection = make_engine(tmp_path, monkeypatch, major_version=13)
+    df = pd.DataFrame({'ENTITY': ['E1', 'E\n2'], 'value': [1.5, 2.0]})
+    
+    engine.load_dataframe(df)
+    
+    assert connection.files == []
+    assert connection.executemany_rows == [('E1', 1.5), ('E\n2', 2.0)]
+    with pytest.raises(ValueError):
+        engine.bulk_load_dataframe(df)
+
+
+def test_older_servers_bulk_load_without_quoting(tmp_path, monkeypatch):
+    engine, connection = make_engine(tmp_path, monkeypatch, major_version=13)
+    df = pd.DataFrame({'ENTITY': ['E1', 'E"2'], 'value': [1.5, None]})
+    
+    engine.load_dataframe(df)
+    
+    bulk_sql = next(sql for sql in connection.statements if 'BULK INSERT' in sql)
+    assert 'FORMAT' not in bulk_sql
+    assert connection.files == ['E1\x011.5\nE"2\x01\n']
+
+
+def test_duplicate_ranking_keeps_latest_load_then_oldest_work_week(tmp_path, monkeypatch):
+    engine, _ = make_engine(tmp_path, monkeypatch, major_version=14, table_name='entity_states')
+    run_1, run_2 = '2025-01-08 06:00:00', '2025-01-15 06:00:00'
+    rows = [
+        # FAB_ENTITY, DAY_SHIFT, ENTITY_STATE, load_ww, load_ts, HOURS_IN_STATE
+        ('F28_E1', '01/02/2025-D', 'Running1', '2025WW02', run_1, 1.0),
+        # Both weeks of the second run carry the same run load_ts - the older
+        # week (the file read last) wins the tie
+        ('F28_E1', '01/02/2025-D', 'Running1', '2025WW03', run_2, 3.0),
+        ('F28_E1', '01/02/2025-D', 'Running1', '2025WW02', run_2, 2.0),
+        ('F28_E2', '01/02/2025-D', 'Idle', '2025WW03', run_2, 4.0),
+        # Outside the weeks being checked - never ranked
+        ('F28_E1', '01/02/2025-D', 'Running1', '2025WW01', run_2, 5.0)
+    ]
+    
+    # sqlite stands in for SQL Server (same ROW_NUMBER semantics, [] quoting)
+    connection = sqlite3.connect(':memory:')
+    connection.execute("ATTACH DATABASE ':memory:' AS dbo")
+    connection.execute(
+        'CREATE TABLE dbo.entity_states (FAB_ENTITY, DAY_SHIFT, ENTITY_STATE, load_ww, load_ts, HOURS_IN_STATE)'
+    )
+    connection.executemany('INSERT INTO dbo.entity_states VALUES (?, ?, ?, ?, ?, ?)', rows)
+    
+    # Same arguments as EntityStatesIngestion.stream_to_sqlserver
+    ranking_sql, params = engine.duplicate_ranking_sql(
+        key_columns=['FAB_ENTITY', 'DAY_SHIFT', 'ENTITY_STATE'],
+        order_columns=['load_ts'],
+        filter_column='load_ww',
+        filter_values=['2025WW02', '2025WW03'],
+        ascending_order_columns=['load_ww']
+    )
+    kept = connection.execute(
+        f"SELECT FAB_ENTITY, load_ww, HOURS_IN_STATE FROM ({ranking_sql}) WHERE row_num = 1 ORDER BY FAB_ENTITY",
+        params
+    ).fetchall()
+    
+    assert kept == [('F28_E1', '2025WW02', 2.0), ('F28_E2', '2025WW03', 4.0)]
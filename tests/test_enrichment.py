@@ -0,0 +1,81 @@
+"""
+Tests for Silver Enrichment - parallel path
+============================================
+The parallel (entity shard) path must return the same state hours and wafer
+production as the serial path: same rows, same order, same dtypes.
+"""
+
+import pandas as pd
+import pytest
+
+from etl.silver.enrichment import SilverEnrichment
+from etl.silver.state_hours import calculate_state_hours
+from etl.silver.wafer_production import calculate_wafer_production
+
+
+ENTITIES = ['ETCH01_PM1', 'ETCH01_PM2', 'ETCH02_PM1', 'ETCH02_PM2', 'ETCH03_PM1']
+
+
+def make_entity_states() -> pd.DataFrame:
+    """EntityStates Bronze rows (ENTITY/FAB/FAB_ENTITY categorical, as loaded)."""
+    rows = []
+    for day in range(1, 5):
+        for number, entity in enumerate(ENTITIES[:-1]):
+            states = [('Running1', 10.0 + number), ('Idle', 6.0), ('Bagged' if number == 1 else 'Down', 8.0 - number)]
+            for state, hours in states:
+                rows.append({
+                    'ENTITY': entity,
+                    'FAB': 'F28',
+                    'FAB_ENTITY': f'F28_{entity}',
+                    'ENTITY_STATE': state,
+                    'HOURS_IN_STATE': hours,
+                    'DAY_SHIFT': f'01/0{day}/2025-D'
+                })
+    
+    df = pd.DataFrame(rows)
+    for col in ['ENTITY', 'FAB', 'FAB_ENTITY', 'ENTITY_STATE']:
+        df[col] = df[col].astype('category')
+    return df
+
+
+def make_counters() -> pd.DataFrame:
+    """Counters Bronze rows, including a part replacement and an entity with no states."""
+    rows = []
+    for day in range(1, 5):
+        for number, entity in enumerate(ENTITIES):
+            focus = 5000.0 + 100 * day + number
+            if entity == 'ETCH02_PM1' and day == 3:
+                focus = 20.0  # part replacement
+            rows.append({
+                'ENTITY': entity,
+                'counter_date': pd.Timestamp(f'2025-01-0{day}'),
+                'FocusRingCounter': focus if number != 3 else None,
+                'APCCounter': 800.0 + 50 * day,
+                'ESCCounter': None
+            })
+    return pd.DataFrame(rows)
+
+
+def run_serial(config, entity_states_df: pd.DataFrame, counters_df: pd.DataFrame):
+    """State hours and wafer production from the serial path."""
+    state_hours_df = calculate_state_hours(config, entity_states_df)
+    return state_hours_df, calculate_wafer_production(config, counters_df, state_hours_df)
+
+
+@pytest.mark.parametrize('empty', [None, 'entity_states', 'counters', 'both'])
+def test_parallel_matches_serial(config, empty):
+    entity_states_df = make_entity_states()
+    counters_df = make_counters()
+    if empty in ('entity_states', 'both'):
+        entity_states_df = entity_states_df.iloc[:0]
+    if empty in ('counters', 'both'):
+        counters_df = counters_df.iloc[:0]
+    
+    serial_state_hours, serial_production = run_serial(config, entity_states_df, counters_df)
+    parallel_state_hours, parallel_production = SilverEnrichment(config).enrich_parallel(
+        entity_states_df, counters_df, max_workers=2
+    )
+    
+    # assert_frame_equal also compares dtypes, including categories
+    pd.testing.assert_frame_equal(parallel_state_hours, serial_state_hours)
+    pd.testing.assert_frame_equal(parallel_production, serial_production)
@@ -0,0 +1,56 @@
+"""
+Tests for helpers - Intel work weeks
+=====================================
+get_intel_ww_vec must follow the per-date fiscal calendar calculation it
+replaced, including across year boundaries, and must not fail on NaT.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils.helpers import get_intel_ww, get_intel_ww_vec
+
+
+def reference_intel_ww(dt: datetime) -> str:
+    """The original per-date work week calculation."""
+    iso_year = dt.isocalendar()[0]
+    
+    dec_28 = datetime(iso_year - 1, 12, 28)
+    fiscal_year_start = dec_28 - timedelta(days=(dec_28.weekday() + 1) % 7)
+    fiscal_year = iso_year
+    
+    if dt < fiscal_year_start:
+        fiscal_year = iso_year - 1
+        dec_28 = datetime(fiscal_year - 1, 12, 28)
+        fiscal_year_start = dec_28 - timedelta(days=(dec_28.weekday() + 1) % 7)
+    
+    return f"{fiscal_year}WW{(dt - fiscal_year_start).days // 7 + 1:02d}"
+
+
+def test_get_intel_ww_vec_across_year_boundaries():
+    # Every day from mid-December to mid-January over several year ends
+    dates = pd.DatetimeIndex(np.concatenate([
+        pd.date_range(f'{year}-12-15', f'{year + 1}-01-15').values for year in range(2019, 2031)
+    ]))
+    
+    work_weeks = get_intel_ww_vec(dates.values)
+    
+    assert work_weeks.tolist() == [reference_intel_ww(dt) for dt in dates.to_pydatetime()]
+
+
+def test_get_intel_ww_matches_vectorized():
+    for day in ['2024-12-28', '2024-12-29', '2024-12-30', '2025-01-01']:
+        dt = datetime.fromisoformat(day)
+        assert get_intel_ww(dt) == get_intel_ww_vec(np.array([day], dtype='datetime64[D]'))[0]
+
+
+def test_get_intel_ww_vec_nat():
+    dates = pd.to_datetime(['2025-01-01', None, '2025-06-15']).values
+    
+    work_weeks = get_intel_ww_vec(dates)
+    
+    assert work_weeks.tolist() == [reference_intel_ww(datetime(2025, 1, 1)), '', reference_intel_ww(datetime(2025, 6, 15))]
+    assert get_intel_ww_vec(np.array(['NaT'], dtype='datetime64[D]')).tolist() == ['']
+    assert get_intel_ww_vec(np.array([], dtype='datetime64[D]')).tolist() == []
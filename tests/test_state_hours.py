@@ -0,0 +1,65 @@
+"""
+Tests for Silver State Hours
+=============================
+calculate_daily_state_hours is checked against small hand-computed frames.
+"""
+
+from datetime import datetime
+
+import pandas as pd
+
+from etl.silver.state_hours import StateHoursCalculator
+
+
+def make_entity_states(rows) -> pd.DataFrame:
+    """EntityStates Bronze rows from (ENTITY, DAY_SHIFT, ENTITY_STATE, HOURS_IN_STATE)."""
+    df = pd.DataFrame(rows, columns=['ENTITY', 'DAY_SHIFT', 'ENTITY_STATE', 'HOURS_IN_STATE'])
+    df['FAB'] = 'F28'
+    df['FAB_ENTITY'] = 'F28_' + df['ENTITY']
+    return df
+
+
+def test_parse_day_shift_dates(config):
+    day_shift = pd.Series(['01/02/2025-D', '01/03/25-N', '01/04-D', 'garbage', None])
+    
+    parsed = StateHoursCalculator(config).parse_day_shift_dates(day_shift)
+    
+    expected = pd.Series(pd.to_datetime(['2025-01-02', '2025-01-03', f'{datetime.now().year}-01-04', None, None]))
+    pd.testing.assert_series_equal(parsed, expected, check_names=False)
+
+
+def test_calculate_daily_state_hours_hand_computed(config):
+    entity_states_df = make_entity_states([
+        ('E1', '01/02/2025-D', 'Running1', 5.0),
+        ('E1', '01/02/2025-N', 'Running2', 3.0),
+        ('E1', '01/02/2025-N', ' Running1 ', 1.0),  # padded state name
+        ('E1', '01/02/2025-D', 'Idle', 4.0),
+        ('E1', '01/02/2025-D', 'Down_PM', 2.0),  # unknown state -> Down
+        ('E1', '01/02/2025-N', None, 1.0),  # missing state -> Down
+        ('E1', '01/03/25-D', 'Bagged', 24.0),
+        ('E1', 'garbage', 'Running1', 99.0),  # unparseable date - dropped
+        ('E2', '01/02/2025-D', 'Idle', 6.0)
+    ])
+    
+    result = StateHoursCalculator(config).calculate_daily_state_hours(entity_states_df)
+    
+    expected = pd.DataFrame([
+        ('E1', 'F28', 'F28_E1', '2025-01-02', 0.0, 3.0, 4.0, 9.0, 16.0, False),
+        ('E1', 'F28', 'F28_E1', '2025-01-03', 24.0, 0.0, 0.0, 0.0, 24.0, True),
+        ('E2', 'F28', 'F28_E2', '2025-01-02', 0.0, 0.0, 6.0, 0.0, 6.0, False)
+    ], columns=[
+        'ENTITY', 'FAB', 'FAB_ENTITY', 'state_date',
+        'bagged_hours', 'down_hours', 'idle_hours', 'running_hours', 'total_hours', 'is_bagged'
+    ])
+    expected['state_date'] = pd.to_datetime(expected['state_date'])
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_calculate_daily_state_hours_keeps_every_state_column(config):
+    # Only Running rows - the other state columns still exist, filled with 0
+    entity_states_df = make_entity_states([('E1', '01/02/2025-D', 'Running1', 5.0)])
+    
+    result = StateHoursCalculator(config).calculate_daily_state_hours(entity_states_df)
+    
+    assert result[['bagged_hours', 'down_hours', 'idle_hours', 'running_hours']].iloc[0].tolist() == [0.0, 0.0, 0.0, 5.0]
+    assert result['total_hours'].tolist() == [5.0]
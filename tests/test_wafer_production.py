@@ -0,0 +1,152 @@
+"""
+Tests for Silver Wafer Production
+==================================
+calculate_for_dataframe is checked against a small hand-computed frame and
+against the row-by-row reference (calculate_wafer_production_single_row).
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from etl.silver.wafer_production import WaferProductionCalculator
+
+
+def make_counters() -> pd.DataFrame:
+    """
+    Counters rows (out of order, with one duplicate entity-date).
+    
+    E1: normal day, part replacement recovered by the fallback counter,
+        day without running hours
+    E2: no counter at all, then a counter with no previous value
+    E3: part replacement where the fallback went down as well
+    """
+    rows = [
+        ('E1', '2025-01-02', 9999.0, 550.0),  # superseded by the later E1 2025-01-02 row
+        ('E3', '2025-01-02', 10.0, 5.0),
+        ('E1', '2025-01-01', 1000.0, 500.0),
+        ('E1', '2025-01-02', 1100.0, 550.0),
+        ('E1', '2025-01-03', 50.0, 600.0),
+        ('E1', '2025-01-04', 150.0, 650.0),
+        ('E2', '2025-01-01', np.nan, np.nan),
+        ('E2', '2025-01-02', np.nan, 300.0),
+        ('E3', '2025-01-01', 5000.0, 900.0)
+    ]
+    df = pd.DataFrame(rows, columns=['ENTITY', 'counter_date', 'FocusRingCounter', 'APCCounter'])
+    df['counter_date'] = pd.to_datetime(df['counter_date'])
+    df['ESCCounter'] = np.nan
+    df['SomethingElse'] = 'x'  # not a counter column
+    return df
+
+
+def make_state_hours() -> pd.DataFrame:
+    """Running hours by entity-date (E1 2025-01-04 and E2 have none)."""
+    df = pd.DataFrame([
+        ('E1', '2025-01-01', 10.0),
+        ('E1', '2025-01-02', 20.0),
+        ('E1', '2025-01-03', 10.0),
+        ('E3', '2025-01-02', 8.0)
+    ], columns=['ENTITY', 'state_date', 'running_hours'])
+    df['state_date'] = pd.to_datetime(df['state_date'])
+    return df
+
+
+EXPECTED_COLUMNS = [
+    'ENTITY', 'counter_date', 'counter_column_used', 'counter_keyword_used',
+    'counter_current_value', 'counter_previous_value', 'counter_change',
+    'part_replacement_detected', 'wafers_produced', 'running_hours', 'wafers_per_hour',
+    'calculation_notes'
+]
+
+EXPECTED_ROWS = [
+    ('E1', '2025-01-01', 'FocusRingCounter', 'Focus', 1000.0, np.nan, np.nan, False, np.nan, 10.0, np.nan,
+     'First day - no previous value'),
+    ('E1', '2025-01-02', 'FocusRingCounter', 'Focus', 1100.0, 1000.0, 100.0, False, 100.0, 20.0, 5.0, None),
+    ('E1', '2025-01-03', 'APCCounter', 'APCCounter', 600.0, 550.0, 50.0, True, 50.0, 10.0, 5.0,
+     'Part replacement: FocusRingCounter reset from 1100.0 to 50.0; Used fallback counter: APCCounter'),
+    ('E1', '2025-01-04', 'FocusRingCounter', 'Focus', 150.0, 50.0, 100.0, False, 100.0, 0.0, np.nan,
+     'No running hours - cannot calculate wafers/hour'),
+    ('E2', '2025-01-01', None, None, np.nan, np.nan, np.nan, False, np.nan, 0.0, np.nan,
+     'No counter found with any keyword'),
+    ('E2', '2025-01-02', 'APCCounter', 'APCCounter', 300.0, np.nan, np.nan, False, np.nan, 0.0, np.nan,
+     'Previous value is null'),
+    ('E3', '2025-01-01', 'FocusRingCounter', 'Focus', 5000.0, np.nan, np.nan, False, np.nan, 0.0, np.nan,
+     'First day - no previous value'),
+    ('E3', '2025-01-02', 'FocusRingCounter', 'Focus', 10.0, 5000.0, 0.0, True, 0.0, 8.0, 0.0,
+     'Part replacement: FocusRingCounter reset from 5000.0 to 10.0; Counter change set to 0 (part replacement)')
+]
+
+
+def as_plain(df: pd.DataFrame) -> pd.DataFrame:
+    """Categorical columns as object columns (missing as None), for comparison with plain frames."""
+    df = df.copy()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object).where(df[col].notna(), None)
+    return df
+
+
+def reference_production(calculator: WaferProductionCalculator, counters_df: pd.DataFrame,
+                         state_hours_df: pd.DataFrame) -> pd.DataFrame:
+    """Apply the row-by-row reference to each entity's rows in date order."""
+    counters_df = counters_df.drop_duplicates(['ENTITY', 'counter_date'], keep='last')
+    running_hours = {
+        (entity, date): hours
+        for entity, date, hours in state_hours_df[['ENTITY', 'state_date', 'running_hours']].itertuples(index=False)
+    }
+    
+    results = []
+    for _, entity_rows in counters_df.sort_values(['ENTITY', 'counter_date']).groupby('ENTITY', sort=True):
+        previous_row = None
+        for _, row in entity_rows.iterrows():
+            result = calculator.calculate_wafer_production_single_row(
+                row, previous_row, running_hours.get((row['ENTITY'], row['counter_date']), 0.0)
+            )
+            result['calculation_notes'] = '; '.join(result['calculation_notes']) or None
+            results.append(result)
+            previous_row = row
+    
+    return pd.DataFrame(results, columns=EXPECTED_COLUMNS)
+
+
+def test_calculate_for_dataframe_hand_computed(config):
+    calculator = WaferProductionCalculator(config)
+    
+    result = calculator.calculate_for_dataframe(make_counters(), make_state_hours())
+    
+    expected = pd.DataFrame(EXPECTED_ROWS, columns=EXPECTED_COLUMNS)
+    expected['counter_date'] = pd.to_datetime(expected['counter_date'])
+    pd.testing.assert_frame_equal(as_plain(result), expected)
+
+
+def test_calculate_for_dataframe_matches_single_row_reference(config):
+    calculator = WaferProductionCalculator(config)
+    counters_df = make_counters()
+    state_hours_df = make_state_hours()
+    
+    result = calculator.calculate_for_dataframe(counters_df, state_hours_df)
+    reference = reference_production(calculator, counters_df, state_hours_df)
+    
+    pd.testing.assert_frame_equal(as_plain(result), reference, check_dtype=False)
+
+
+def test_calculate_for_dataframe_keeps_input_unchanged(config):
+    counters_df = make_counters()
+    before = counters_df.copy()
+    
+    WaferProductionCalculator(config).calculate_for_dataframe(counters_df, make_state_hours())
+    
+    pd.testing.assert_frame_equal(counters_df, before)
+
+
+@pytest.mark.parametrize('keywords, expected', [
+    (['Focus'], ('FocusRingCounter', 1000.0, 'Focus')),
+    (['NotConfigured'], None)
+])
+def test_find_counter_column(config, keywords, expected):
+    calculator = WaferProductionCalculator(config)
+    
+    # Prepared for a frame with other counter columns first
+    calculator.prepare_columns(['ENTITY', 'counter_date', 'A_FocusCounter'])
+    
+    assert calculator.find_counter_column(make_counters().iloc[2], keywords) == expected
@@ -22,6 +22,15 @@ from utils.logger import WaferProductionLogger
 
 logger = logging.getLogger(__name__)
 
+# Calculation notes shared by many rows (part replacement notes quote the
+# counter values, so each of those is built for its own row)
+NOTE_CATEGORIES = [
+    'No counter found with any keyword',
+    'First day - no previous value',
+    'Previous value is null',
+    'No running hours - cannot calculate wafers/hour'
+]
+
 
 class WaferProductionCalculator:
     """
@@ -41,8 +50,20 @@ class WaferProductionCalculator:
         self.wafer_config = config['wafer_production']
         self.primary_keywords = self.wafer_config['primary_keywords']
         self.fallback_keywords = self.wafer_config['fallback_keywords']
+        
+        # Keyword search order and keyword sets, built once instead of per row
+        self.all_keywords = self.primary_keywords + self.fallback_keywords
+        self.primary_keyword_set = frozenset(self.primary_keywords)
+        self.fallback_keyword_set = frozenset(self.fallback_keywords)
         self.replacement_threshold = self.wafer_config['part_replacement']['negative_threshold']
         
+        # Counter columns matching each keyword, and the columns they were
+        # built from. This is a cache for prepare_columns only - it may belong
+        # to a different DataFrame, so callers get the index from
+        # prepare_columns, never from these attributes
+        self.keyword_columns: Optional[Dict[str, List[str]]] = None
+        self.keyword_columns_source: Optional[Tuple] = None
+        
         # Initialize specialized logger
         self.prod_logger = WaferProductionLogger(logger, config['logging'])
         
@@ -51,10 +72,51 @@ class WaferProductionCalculator:
         logger.info(f"Fallback keywords: {self.fallback_keywords}")
         logger.info(f"Replacement threshold: {self.replacement_threshold}")
     
+    def prepare_columns(self, columns) -> Dict[str, List[str]]:
+        """
+        Index the counter columns matching each keyword.
+        
+        Column names are the same for every row, so they are matched against
+        the keywords once per DataFrame instead of once per row. The result is
+        kept and reused while later calls pass the same columns; any other
+        columns are indexed afresh. Every lookup goes through this method
+        (calculate_for_dataframe and find_counter_column alike), so a stale
+        index is never used.
+        
+        Parameters
+        ----------
+        columns : iterable of str
+            Counters DataFrame columns
+        
+        Returns
+        -------
+        Dict[str, List[str]]
+            Keyword -> matching counter columns, in column order
+        """
+        columns = pd.Index(columns)
+        columns_source = tuple(columns)
+        if self.keyword_columns is not None and columns_source == self.keyword_columns_source:
+            return self.keyword_columns
+        
+        # Narrow to the counter columns once with a vectorized suffix test, so
+        # the keyword matching only scans the (much shorter) counter list
+        columns = columns.to_series()
+        counter_columns = columns[columns.str.endswith('Counter', na=False).to_numpy(dtype=bool)].tolist()
+        self.keyword_columns = {
+            keyword: [col for col in counter_columns if keyword in col]
+            for keyword in self.all_keywords
+        }
+        self.keyword_columns_source = columns_source
+        return self.keyword_columns
+    
     def find_counter_column(self, row: pd.Series, keywords: List[str]) -> Optional[Tuple[str, float, str]]:
         """
         Find first counter column that matches keywords and has a value.
         
+        Uses the column index from prepare_columns for the row's columns, so
+        rows from DataFrames with different counter columns are searched
+        correctly.
+        
         Parameters
         ----------
         row : pd.Series
@@ -67,12 +129,12 @@ class WaferProductionCalculator:
         Tuple[str, float, str] or None
             (column_name, value, keyword_used) if found, None otherwise
         """
+        keyword_columns = self.prepare_columns(row.index)
+        
         for keyword in keywords:
-            # Find columns containing this keyword
-            matching_cols = [col for col in row.index if keyword in col and col.endswith('Counter')]
-            
-            # Check each matching column for a non-null value
-            for col in matching_cols:
+            # Check each column matching this keyword for a non-null value
+            # (keywords outside the configured ones simply have no columns)
+            for col in keyword_columns.get(keyword, []):
                 value = row[col]
                 if pd.notna(value) and value > 0:
                     return (col, value, keyword)
@@ -152,6 +214,9 @@ class WaferProductionCalculator:
         """
         Calculate wafer production for a single entity-date row.
         
+        Row-by-row reference for calculate_for_dataframe, which applies the
+        same rules to all rows at once.
+        
         Parameters
         ----------
         current_row : pd.Series
@@ -185,7 +250,7 @@ class WaferProductionCalculator:
         }
         
         # Try primary keywords first
-        all_keywords = self.primary_keywords + self.fallback_keywords
+        all_keywords = self.all_keywords
         counter_found = self.find_counter_column(current_row, all_keywords)
         
         if not counter_found:
@@ -229,7 +294,7 @@ class WaferProductionCalculator:
                 result['calculation_notes'].append(f'Part replacement: {counter_col} reset from {previous_val} to {current_val}')
                 
                 # Try fallback counter
-                if keyword in self.primary_keywords:
+                if keyword in self.primary_keyword_set:
                     fallback_found = self.find_counter_column(current_row, self.fallback_keywords)
                     if fallback_found:
                         fallback_col, fallback_val, fallback_keyword = fallback_found
@@ -267,10 +332,40 @@ class WaferProductionCalculator:
         
         return result
     
+    def first_positive_counter(self, is_positive: np.ndarray, candidate_positions: np.ndarray) -> np.ndarray:
+        """
+        Find, for every row, the first candidate counter with a positive value.
+        
+        Parameters
+        ----------
+        is_positive : np.ndarray
+            2-D boolean array (rows x counter columns), True where the counter
+            has a positive value
+        candidate_positions : np.ndarray
+            Column positions in is_positive of the candidates, in search order
+        
+        Returns
+        -------
+        np.ndarray
+            Index of the first matching candidate for each row
+            (len(candidate_positions) where no candidate matches)
+        """
+        if not len(candidate_positions):
+            return np.zeros(len(is_positive), dtype=np.intp)
+        
+        # argmax returns the first True column; rows without one are marked
+        # with the "none found" index
+        candidate_positive = is_positive[:, candidate_positions]
+        return np.where(candidate_positive.any(axis=1), candidate_positive.argmax(axis=1), len(candidate_positions))
+    
     def calculate_for_dataframe(self, counters_df: pd.DataFrame, state_hours_df: pd.DataFrame) -> pd.DataFrame:
         """
         Calculate wafer production for entire DataFrame.
         
+        All rows are calculated at once with array operations, with the same
+        results as calculate_wafer_production_single_row applied to each
+        entity's rows in date order.
+        
         Parameters
         ----------
         counters_df : pd.DataFrame
@@ -285,46 +380,226 @@ class WaferProductionCalculator:
         """
         logger.info("Starting wafer production calculation")
         
-        # Sort by entity and date
-        counters_df = counters_df.sort_values(['ENTITY', 'counter_date']).reset_index(drop=True)
-        
-        results = []
-        
-        # Group by entity
-        for entity, entity_group in counters_df.groupby('ENTITY'):
-            entity_group = entity_group.sort_values('counter_date').reset_index(drop=True)
-            
-            # Process each day
-            for idx, current_row in entity_group.iterrows():
-                # Get previous row
-                previous_row = entity_group.iloc[idx - 1] if idx > 0 else None
-                
-                # Get running hours for this day
-                date = current_row['counter_date']
-                running_hours_row = state_hours_df[
-                    (state_hours_df['ENTITY'] == entity) & 
-                    (state_hours_df['state_date'] == date)
-                ]
-                
-                running_hours = running_hours_row['running_hours'].values[0] if len(running_hours_row) > 0 else 0
-                
-                # Calculate production
-                result = self.calculate_wafer_production_single_row(current_row, previous_row, running_hours)
-                results.append(result)
-        
-        # Convert to DataFrame
-        production_df = pd.DataFrame(results)
+        # Remove duplicates based on ENTITY and counter_date (keep last) before
+        # calculating, then sort by entity and date (rows without an ENTITY
+        # are skipped). Only the two key columns are deduplicated and sorted;
+        # counter columns are read once, in this order, below - the wide
+        # frame itself is never sorted or copied
+        row_keys = counters_df[['ENTITY', 'counter_date']].reset_index(drop=True)
+        before_dedup = len(row_keys)
+        row_keys = row_keys.drop_duplicates(keep='last')
+        if before_dedup > len(row_keys):
+            logger.info(f"Removed {before_dedup - len(row_keys)} duplicate rows")
+        
+        row_keys = row_keys.sort_values(['ENTITY', 'counter_date'])
+        row_keys = row_keys[row_keys['ENTITY'].notna()]
+        order = row_keys.index.to_numpy()
+        n_rows = len(row_keys)
+        rows = np.arange(n_rows)
+        
+        # The previous day is the previous row of the same entity (rows are
+        # sorted, so the factorized entities are in sorted order too)
+        entity_codes, entity_names = pd.factorize(row_keys['ENTITY'])
+        has_previous = np.zeros(n_rows, dtype=bool)
+        has_previous[1:] = entity_codes[1:] == entity_codes[:-1]
+        
+        # Counter columns matching each keyword, in keyword priority order
+        all_keywords = self.all_keywords
+        keyword_columns = self.prepare_columns(counters_df.columns)
+        candidates = [(keyword, col) for keyword in all_keywords for col in keyword_columns[keyword]]
+        fallback_candidates = [(keyword, col) for keyword, col in candidates if keyword in self.fallback_keyword_set]
+        counter_columns = list(dict.fromkeys(col for _, col in candidates))
+        keyword_categories = list(dict.fromkeys(all_keywords))
+        
+        # Values of every counter column, plus an all-NaN column that stands
+        # in for "no counter". Previous-day values are read from the row above
+        # for the chosen counter only, so no shifted copy of the whole matrix
+        # is ever held
+        counter_values = np.full((n_rows, len(counter_columns) + 1), np.nan)
+        for position, col in enumerate(counter_columns):
+            counter_values[:, position] = counters_df[col].to_numpy(dtype=np.float64, na_value=np.nan)[order]
+        previous_rows = np.flatnonzero(has_previous)
+        
+        def current_and_previous(positions):
+            previous = np.full(n_rows, np.nan)
+            previous[previous_rows] = counter_values[previous_rows - 1, positions[previous_rows]]
+            return counter_values[rows, positions], previous
+        
+        # One comparison over the whole matrix serves both the counter and the
+        # fallback search (NaN > 0 is False, so missing values never match)
+        is_positive = counter_values > 0
+        
+        # Counters and keywords are handled as integer codes (column position
+        # and keyword_categories index); the extra last candidate entry is
+        # "no counter found", which maps to None in the name lookups below
+        column_names = np.array(counter_columns + [None], dtype=object)
+        keyword_names = np.array(keyword_categories + [None], dtype=object)
+        
+        def candidate_arrays(candidate_list):
+            keyword_codes = np.array(
+                [keyword_categories.index(keyword) for keyword, _ in candidate_list] + [-1], dtype=np.intp
+            )
+            positions = np.array(
+                [counter_columns.index(col) for _, col in candidate_list] + [len(counter_columns)], dtype=np.intp
+            )
+            return keyword_codes, positions
+        
+        keyword_codes, positions = candidate_arrays(candidates)
+        fallback_keyword_codes, fallback_positions = candidate_arrays(fallback_candidates)
+        
+        # Counter used for each row: first positive value by keyword priority
+        candidate = self.first_positive_counter(is_positive, positions[:-1])
+        found = candidate < len(candidates)
+        counter_position = positions[candidate]
+        counter_keyword_code = keyword_codes[candidate]
+        counter_keyword = keyword_names[counter_keyword_code]
+        counter_column = column_names[counter_position]
+        current_value, previous_value = current_and_previous(counter_position)
+        counter_change = current_value - previous_value
+        
+        # Negative changes beyond the threshold are part replacements
+        negative_change = counter_change < 0
+        part_replacement = negative_change & (counter_change < self.replacement_threshold)
+        
+        # A replaced primary counter falls back to the first positive fallback
+        # counter, which is used if it did not go down as well. Only those
+        # rows are searched (usually none, so the search is skipped)
+        is_primary = np.array(
+            [keyword in self.primary_keyword_set for keyword in keyword_categories] + [False]
+        )[counter_keyword_code]
+        fallback_position = np.full(n_rows, len(counter_columns), dtype=np.intp)
+        fallback_keyword_code = np.full(n_rows, -1, dtype=np.intp)
+        replaced_primary_rows = np.flatnonzero(part_replacement & is_primary)
+        if replaced_primary_rows.size:
+            fallback_candidate = self.first_positive_counter(is_positive[replaced_primary_rows], fallback_positions[:-1])
+            fallback_position[replaced_primary_rows] = fallback_positions[fallback_candidate]
+            fallback_keyword_code[replaced_primary_rows] = fallback_keyword_codes[fallback_candidate]
+        fallback_tried = fallback_position < len(counter_columns)
+        fallback_current, fallback_previous = current_and_previous(fallback_position)
+        fallback_change = fallback_current - fallback_previous
+        use_fallback = fallback_tried & (fallback_change >= 0)
+        
+        # The value matrices are not needed past this point; release them
+        # before the output arrays are built to keep peak memory down
+        del counter_values, is_positive
+        
+        used_position = np.where(use_fallback, fallback_position, counter_position)
+        used_keyword_code = np.where(use_fallback, fallback_keyword_code, counter_keyword_code)
+        counter_current_value = np.where(use_fallback, fallback_current, current_value)
+        counter_previous_value = np.where(use_fallback, fallback_previous, previous_value)
+        final_change = np.where(use_fallback, fallback_change, counter_change)
+        del fallback_current, fallback_previous, fallback_change
+        
+        # If still negative, set to zero (in place)
+        set_to_zero = part_replacement & (final_change < 0)
+        final_change[set_to_zero] = 0.0
+        
+        # Running hours for each entity-date (one hash join instead of a
+        # filter per row; 0 where there are no state hours)
+        running_hours = row_keys.merge(
+            state_hours_df[['ENTITY', 'state_date', 'running_hours']].drop_duplicates(['ENTITY', 'state_date']),
+            left_on=['ENTITY', 'counter_date'],
+            right_on=['ENTITY', 'state_date'],
+            how='left'
+        )['running_hours'].to_numpy(dtype=np.float64, na_value=0.0)
+        
+        # Calculate wafers produced and wafers per hour (each output array is
+        # written in a single pass straight from the final change, with no
+        # intermediate copies)
+        has_wafers = final_change >= 0
+        has_running_hours = has_wafers & (running_hours > 0)
+        wafers_produced = np.where(has_wafers, final_change, np.nan)
+        wafers_per_hour = np.full(n_rows, np.nan)
+        np.divide(final_change, running_hours, out=wafers_per_hour, where=has_running_hours)
+        
+        # Calculation notes, stored as a categorical: the common notes are
+        # fixed categories, and each part replacement note (which quotes the
+        # values as they appear in the source column) is added as it is built
+        no_running_hours = has_wafers & ~has_running_hours
+        note_codes = np.full(n_rows, -1, dtype=np.int32)
+        note_codes[~found] = NOTE_CATEGORIES.index('No counter found with any keyword')
+        note_codes[found & ~has_previous] = NOTE_CATEGORIES.index('First day - no previous value')
+        note_codes[found & has_previous & np.isnan(previous_value)] = NOTE_CATEGORIES.index('Previous value is null')
+        note_codes[no_running_hours] = NOTE_CATEGORIES.index('No running hours - cannot calculate wafers/hour')
+        
+        replacement_notes = {}
+        for row in np.flatnonzero(part_replacement):
+            col = counter_column[row]
+            notes = [
+                f'Part replacement: {col} reset from '
+                f'{counters_df[col].iat[order[row - 1]]} to {counters_df[col].iat[order[row]]}'
+            ]
+            if use_fallback[row]:
+                notes.append(f'Used fallback counter: {column_names[used_position[row]]}')
+            if set_to_zero[row]:
+                notes.append('Counter change set to 0 (part replacement)')
+            if no_running_hours[row]:
+                notes.append('No running hours - cannot calculate wafers/hour')
+            note = '; '.join(notes)
+            note_codes[row] = replacement_notes.setdefault(note, len(NOTE_CATEGORIES) + len(replacement_notes))
+        
+        calculation_notes = pd.Categorical.from_codes(note_codes, categories=NOTE_CATEGORIES + list(replacement_notes))
+        
+        # Audit trail. Each kind of event is only visited when its log line
+        # would be written (setting on and level enabled), so with the audit
+        # lines switched off no per-row work is done at all
+        prod_logger = self.prod_logger
+        entities = row_keys['ENTITY'].to_numpy()
+        dates = row_keys['counter_date'].to_numpy()
+        
+        if prod_logger.is_enabled('log_no_counter_found', logging.WARNING):
+            for row in np.flatnonzero(~found):
+                prod_logger.log_no_counter_found(entities[row], str(pd.Timestamp(dates[row])), all_keywords)
+        
+        if prod_logger.is_enabled('log_counter_used', logging.INFO):
+            for row in np.flatnonzero(found):
+                prod_logger.log_counter_found(
+                    entities[row], str(pd.Timestamp(dates[row])),
+                    counter_column[row], current_value[row], counter_keyword[row]
+                )
         
-        # Convert notes list to string
-        production_df['calculation_notes'] = production_df['calculation_notes'].apply(lambda x: '; '.join(x) if x else None)
+        # Negative changes, replacements and fallbacks - only the (few) rows
+        # where the counter went down are visited
+        for row in np.flatnonzero(negative_change):
+            entity = entities[row]
+            date = str(pd.Timestamp(dates[row]))
+            prod_logger.log_negative_change(
+                entity, date, counter_column[row], previous_value[row], current_value[row], counter_change[row]
+            )
+            if part_replacement[row]:
+                self.detect_part_replacement(
+                    counter_change[row], entity, date, counter_column[row], current_value[row], previous_value[row]
+                )
+            if fallback_tried[row]:
+                prod_logger.log_fallback_used(
+                    entity, date, counter_keyword[row], keyword_names[fallback_keyword_code[row]], 'part replacement'
+                )
         
-        # Remove duplicates based on ENTITY and counter_date
-        before_dedup = len(production_df)
-        production_df = production_df.drop_duplicates(subset=['ENTITY', 'counter_date'], keep='last')
-        after_dedup = len(production_df)
+        if prod_logger.is_enabled(None, logging.DEBUG):
+            for row in np.flatnonzero(has_running_hours):
+                prod_logger.log_wafer_calculation(
+                    entities[row], str(pd.Timestamp(dates[row])),
+                    final_change[row], running_hours[row], wafers_per_hour[row]
+                )
         
-        if before_dedup > after_dedup:
-            logger.info(f"Removed {before_dedup - after_dedup} duplicate rows")
+        # ENTITY and the counter column/keyword repeat on many rows, so they
+        # are returned as categoricals built straight from their codes
+        production_df = pd.DataFrame({
+            'ENTITY': pd.Categorical.from_codes(entity_codes, categories=np.asarray(entity_names, dtype=object)),
+            'counter_date': dates,
+            'counter_column_used': pd.Categorical.from_codes(
+                np.where(used_position == len(counter_columns), -1, used_position), categories=counter_columns
+            ),
+            'counter_keyword_used': pd.Categorical.from_codes(used_keyword_code, categories=keyword_categories),
+            'counter_current_value': counter_current_value,
+            'counter_previous_value': counter_previous_value,
+            'counter_change': final_change,
+            'part_replacement_detected': part_replacement,
+            'wafers_produced': wafers_produced,
+            'running_hours': running_hours,
+            'wafers_per_hour': wafers_per_hour,
+            'calculation_notes': calculation_notes
+        })
         
         logger.info(f"Wafer production calculation complete: {len(production_df)} rows")
         logger.info(f"Rows with wafers calculated: {production_df['wafers_produced'].notna().sum()}")